@@ -6,10 +6,49 @@ Professional UI for database migration with visual column mapping
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode
 import threading
-from datetime import datetime
+from datetime import date, datetime
 import queue
+import json
+import time
+import os
+import re
+import sys
+import argparse
+import signal
+import socket
+import random
+import zlib
+import pickle
+import shutil
+import tempfile
+import cProfile
+import pstats
+import tracemalloc
+import urllib.request
+import urllib.error
+from urllib.parse import urlparse
+from collections import Counter
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
 
 
 class DatabaseConnection:
@@ -21,71 +60,2098 @@ class DatabaseConnection:
         self.database = database
         self.connection = None
     
-    def connect(self):
-        try:
-            print(f"\n[Attempting Connection]")
-            print(f"Host: {self.host}")
-            print(f"Port: {self.port}")
-            print(f"User: {self.user}")
-            print(f"Database: {self.database}")
-            
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=self.database
-            )
-            print(f"[SUCCESS] Connected to {self.database}\n")
-            return True, "Connected successfully"
-        except Error as e:
-            error_msg = f"Connection failed: {str(e)}"
-            print(f"\n[CONNECTION ERROR]")
-            print(f"Host: {self.host}")
-            print(f"Database: {self.database}")
-            print(f"Error Type: {type(e).__name__}")
-            print(f"Error Message: {str(e)}")
-            print(f"Error Code: {e.errno if hasattr(e, 'errno') else 'N/A'}")
-            print(f"SQL State: {e.sqlstate if hasattr(e, 'sqlstate') else 'N/A'}\n")
-            return False, error_msg
+    def clone(self):
+        """
+        Unconnected copy with the same settings. mysql-connector connections
+        are not thread-safe, so background tasks connect their own copy.
+        """
+        return DatabaseConnection(self.host, self.port, self.user, self.password, self.database)
+    
+    def connect(self, verbose=True):
+        try:
+            if verbose:
+                print(f"\n[Attempting Connection]")
+                print(f"Host: {self.host}")
+                print(f"Port: {self.port}")
+                print(f"User: {self.user}")
+                print(f"Database: {self.database}")
+            
+            self.connection = mysql.connector.connect(
+                host=self.host,
+                port=self.port,
+                user=self.user,
+                password=self.password,
+                database=self.database
+            )
+            if verbose:
+                print(f"[SUCCESS] Connected to {self.database}\n")
+            return True, "Connected successfully"
+        except Error as e:
+            error_msg = f"Connection failed: {str(e)}"
+            print(f"\n[CONNECTION ERROR]")
+            print(f"Host: {self.host}")
+            print(f"Database: {self.database}")
+            print(f"Error Type: {type(e).__name__}")
+            print(f"Error Message: {str(e)}")
+            print(f"Error Code: {e.errno if hasattr(e, 'errno') else 'N/A'}")
+            print(f"SQL State: {e.sqlstate if hasattr(e, 'sqlstate') else 'N/A'}\n")
+            return False, error_msg
+    
+    def disconnect(self):
+        if self.connection and self.connection.is_connected():
+            self.connection.close()
+    
+    def get_table_columns(self, table_name):
+        if not self.connection or not self.connection.is_connected():
+            return []
+        
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f"SHOW COLUMNS FROM `{table_name}`")
+            columns = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+            return columns
+        except Error:
+            return []
+    
+    def get_row_count(self, table_name):
+        if not self.connection or not self.connection.is_connected():
+            return 0
+        
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
+            count = cursor.fetchone()[0]
+            cursor.close()
+            return count
+        except Error:
+            return 0
+    
+    def get_approx_row_count(self, table_name):
+        """Row estimate from table metadata; instant, unlike COUNT(*) on InnoDB"""
+        if not self.connection or not self.connection.is_connected():
+            return 0
+        
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (table_name,)
+            )
+            row = cursor.fetchone()
+            cursor.close()
+            return int(row[0] or 0) if row else 0
+        except Error:
+            return 0
+    
+    def get_table_schema(self, table_name):
+        """Returns: list of (column_name, column_type) in table order"""
+        if not self.connection or not self.connection.is_connected():
+            return []
+        
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f"SHOW COLUMNS FROM `{table_name}`")
+            schema = [(row[0], str(row[1]).lower()) for row in cursor.fetchall()]
+            cursor.close()
+            return schema
+        except Error:
+            return []
+    
+    def get_primary_key(self, table_name):
+        """Returns: the primary key column name, or None if missing or composite"""
+        if not self.connection or not self.connection.is_connected():
+            return None
+        
+        try:
+            cursor = self.connection.cursor(dictionary=True)
+            cursor.execute(f"SHOW KEYS FROM `{table_name}` WHERE Key_name = 'PRIMARY'")
+            keys = cursor.fetchall()
+            cursor.close()
+            return keys[0]['Column_name'] if len(keys) == 1 else None
+        except Error:
+            return None
+    
+    def get_update_time(self, table_name):
+        if not self.connection or not self.connection.is_connected():
+            return None
+        
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(
+                "SELECT UPDATE_TIME FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (table_name,)
+            )
+            row = cursor.fetchone()
+            cursor.close()
+            return row[0] if row else None
+        except Error:
+            return None
+
+
+def row_hash_sql(expressions):
+    """
+    SQL expression hashing one row to an unsigned 64-bit integer on the server.
+    A NULL bitmap is prepended so that (NULL, 'a') and ('a', NULL) differ.
+    """
+    null_bitmap = "CONCAT(" + ", ".join(f"ISNULL({expr})" for expr in expressions) + ")"
+    values = ", ".join(expressions)
+    return f"CAST(CONV(SUBSTRING(MD5(CONCAT_WS('#', {null_bitmap}, {values})), 1, 16), 16, 10) AS UNSIGNED)"
+
+
+def job_order_lookup_sql(table="job_orders"):
+    return f"SELECT * FROM {table} WHERE LOWER(TRIM(applicant_email)) = %s"
+
+
+JOB_ORDER_LOOKUP_SQL = job_order_lookup_sql()
+
+# 'multirow' sends each batch as one multi-row INSERT per column set (one
+# round trip); 'row' sends one INSERT per row
+WRITE_STRATEGIES = ('multirow', 'row')
+
+# Errors caused by the values of a particular row. Anything else (unknown
+# column, missing table, no privilege) fails every row alike and stops the run
+ROW_DATA_ERRORS = (
+    errorcode.ER_DATA_TOO_LONG, errorcode.ER_TRUNCATED_WRONG_VALUE, errorcode.ER_TRUNCATED_WRONG_VALUE_FOR_FIELD,
+    errorcode.ER_WARN_DATA_OUT_OF_RANGE, errorcode.WARN_DATA_TRUNCATED, errorcode.ER_BAD_NULL_ERROR,
+    errorcode.ER_NO_DEFAULT_FOR_FIELD, errorcode.ER_DUP_ENTRY, errorcode.ER_NO_REFERENCED_ROW_2,
+    errorcode.ER_INVALID_JSON_TEXT
+)
+
+
+def job_order_insert_sql(columns, table="job_orders"):
+    columns = list(columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+TIMESTAMP_FORMATS = (
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M', '%Y-%m-%d',
+    '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y', '%m/%d/%y'
+)
+
+
+def parse_timestamp(value):
+    """
+    DATETIME values pass through; legacy text timestamps are parsed.
+    Returns: datetime, or None when the value is empty or unrecognised
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if value is None:
+        return None
+    
+    text = str(value).strip()
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m {seconds:02d}s" if hours else f"{minutes}m {seconds:02d}s"
+
+
+class SourceSnapshot:
+    """
+    Local Arrow IPC copy of a DB1 table for repeated rehearsal runs.
+    Rows are stored as record batches per primary key range (CHUNK_ROWS ids),
+    with a JSON manifest holding the row count and server-side hash of each
+    range. A refresh only re-reads ranges whose hash changed on DB1. Reads
+    memory-map the file; with compression=None they are also zero-copy.
+    Tables without a single-column primary key are kept as one range.
+    """
+    CHUNK_ROWS = 5000
+    
+    def __init__(self, db, table_name, directory="snapshots", compression="lz4"):
+        self.db = db
+        self.table_name = table_name
+        self.compression = compression
+        
+        safe_name = re.sub(r'[^A-Za-z0-9_]+', '_', table_name).strip('_').lower()
+        self.path = os.path.join(directory, f"{safe_name}.arrow")
+        self.manifest_path = os.path.join(directory, f"{safe_name}.json")
+        
+        self._table = None
+    
+    @property
+    def available(self):
+        return pa is not None
+    
+    @property
+    def num_rows(self):
+        return self._open().num_rows
+    
+    def exists(self):
+        return os.path.exists(self.path) and os.path.exists(self.manifest_path)
+    
+    def is_stale(self):
+        """Cheap check against information_schema, without scanning DB1"""
+        if not self.exists():
+            return True
+        
+        update_time = self.db.get_update_time(self.table_name)
+        if update_time is None:
+            return True
+        return str(update_time) != self._load_manifest().get('source_update_time')
+    
+    def fetch(self, offset, limit):
+        """Same contract as SELECT * ... LIMIT/OFFSET with a dictionary cursor"""
+        return self._open().slice(offset, limit).to_pylist()
+    
+    def refresh(self):
+        """
+        Bring the snapshot up to date with DB1, re-reading changed ranges only.
+        Returns: dict with 'rows', 'chunks' and 'reread' counts
+        """
+        if pa is None:
+            raise RuntimeError("pyarrow is not installed; snapshots are unavailable")
+        
+        update_time = self.db.get_update_time(self.table_name)
+        schema_columns = self.db.get_table_schema(self.table_name)
+        if not schema_columns:
+            raise RuntimeError(f"Cannot read columns of `{self.table_name}` from DB1")
+        
+        key = self.db.get_primary_key(self.table_name)
+        columns = [name for name, _ in schema_columns]
+        schema = pa.schema([(name, self._arrow_type(col_type)) for name, col_type in schema_columns])
+        
+        manifest = self._load_manifest()
+        layout = {'columns': columns, 'key': key, 'chunk_rows': self.CHUNK_ROWS, 'compression': self.compression}
+        local_chunks = manifest.get('chunks', {}) if manifest.get('layout') == layout else {}
+        remote_chunks = self._chunk_hashes(columns, key)
+        
+        self.close()
+        old_source = None
+        old_reader = None
+        if local_chunks and os.path.exists(self.path):
+            old_source = pa.memory_map(self.path, 'r')
+            old_reader = pa.ipc.open_file(old_source)
+        
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        
+        new_chunks = {}
+        batch_index = 0
+        reread = 0
+        rows = 0
+        
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, schema, options=options) as writer:
+                for chunk_id in sorted(remote_chunks, key=int):
+                    info = remote_chunks[chunk_id]
+                    local = local_chunks.get(chunk_id)
+                    
+                    if old_reader is not None and local and local['hash'] == info['hash']:
+                        batches = [old_reader.get_batch(i) for i in local['batches']]
+                    else:
+                        batches = self._read_chunk(int(chunk_id), key, schema)
+                        reread += 1
+                    
+                    indexes = []
+                    for batch in batches:
+                        writer.write_batch(batch)
+                        indexes.append(batch_index)
+                        batch_index += 1
+                        rows += batch.num_rows
+                    
+                    new_chunks[chunk_id] = {'hash': info['hash'], 'rows': info['rows'], 'batches': indexes}
+        
+        batches = None
+        old_reader = None
+        if old_source is not None:
+            old_source.close()
+        os.replace(tmp_path, self.path)
+        
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'table': self.table_name,
+                'layout': layout,
+                'source_update_time': str(update_time) if update_time is not None else None,
+                'refreshed_at': datetime.now().isoformat(timespec='seconds'),
+                'rows': rows,
+                'chunks': new_chunks
+            }, f, indent=2)
+        
+        return {'rows': rows, 'chunks': len(new_chunks), 'reread': reread}
+    
+    def close(self):
+        self._table = None
+    
+    def _open(self):
+        if self._table is None:
+            source = pa.memory_map(self.path, 'r')
+            self._table = pa.ipc.open_file(source).read_all()
+        return self._table
+    
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _chunk_hashes(self, columns, key):
+        """Per-range row count and hash, computed on DB1 in a single query"""
+        row_hash = row_hash_sql([f"`{col}`" for col in columns])
+        chunk_expr = f"FLOOR(`{key}` / {self.CHUNK_ROWS})" if key else "0"
+        
+        cursor = self.db.connection.cursor(dictionary=True)
+        cursor.execute(f"""
+            SELECT chunk_id, COUNT(*) AS row_count, BIT_XOR(h) AS hash_xor, SUM(h) AS hash_sum
+            FROM (SELECT {chunk_expr} AS chunk_id, {row_hash} AS h FROM `{self.table_name}`) hashed
+            GROUP BY chunk_id
+        """)
+        chunks = {
+            str(int(row['chunk_id'])): {'rows': row['row_count'], 'hash': f"{row['hash_xor']}:{row['hash_sum']}"}
+            for row in cursor.fetchall()
+        }
+        cursor.close()
+        return chunks
+    
+    def _read_chunk(self, chunk_id, key, schema):
+        cursor = self.db.connection.cursor(dictionary=True)
+        if key:
+            cursor.execute(
+                f"SELECT * FROM `{self.table_name}` WHERE `{key}` >= %s AND `{key}` < %s ORDER BY `{key}`",
+                (chunk_id * self.CHUNK_ROWS, (chunk_id + 1) * self.CHUNK_ROWS)
+            )
+        else:
+            cursor.execute(f"SELECT * FROM `{self.table_name}`")
+        
+        batches = []
+        while True:
+            rows = cursor.fetchmany(self.CHUNK_ROWS)
+            if not rows:
+                break
+            batches.append(pa.RecordBatch.from_pylist([self._coerce_row(row, schema) for row in rows], schema=schema))
+        cursor.close()
+        return batches
+    
+    @staticmethod
+    def _coerce_row(row, schema):
+        for field in schema:
+            value = row.get(field.name)
+            if value is None:
+                continue
+            if pa.types.is_string(field.type) and not isinstance(value, str):
+                if isinstance(value, (bytes, bytearray)):
+                    row[field.name] = value.decode('utf-8', errors='replace')
+                elif isinstance(value, set):
+                    row[field.name] = ','.join(sorted(value))
+                else:
+                    row[field.name] = str(value)
+        return row
+    
+    @staticmethod
+    def _arrow_type(column_type):
+        # MySQL 8.0.19+ drops the display width: 'int unsigned', not 'int(10) unsigned'
+        base = column_type.split('(')[0].split()[0]
+        
+        if base in ('tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint', 'year', 'bit'):
+            return pa.uint64() if 'unsigned' in column_type and base == 'bigint' else pa.int64()
+        if base in ('float', 'double', 'real'):
+            return pa.float64()
+        if base in ('decimal', 'numeric'):
+            match = re.match(r'\w+\((\d+)(?:,\s*(\d+))?\)', column_type)
+            precision, scale = (int(match.group(1)), int(match.group(2) or 0)) if match else (10, 0)
+            return pa.decimal128(precision, scale)
+        if base in ('datetime', 'timestamp'):
+            return pa.timestamp('us')
+        if base == 'date':
+            return pa.date32()
+        if base == 'time':
+            return pa.duration('us')
+        if base in ('binary', 'varbinary', 'tinyblob', 'blob', 'mediumblob', 'longblob'):
+            return pa.binary()
+        return pa.string()
+
+
+class MigrationControl:
+    """
+    Cooperative pause/resume/cancel for a running migration. The engine
+    calls checkpoint() at every batch boundary, after the batch committed,
+    so stopping never leaves a half-written batch behind.
+    """
+    def __init__(self):
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = threading.Event()
+    
+    @property
+    def paused(self):
+        return not self._running.is_set()
+    
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+    
+    def pause(self):
+        self._running.clear()
+    
+    def resume(self):
+        self._running.set()
+    
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()
+    
+    def wait(self, seconds):
+        """Sleep that returns early on cancel"""
+        self._cancelled.wait(seconds)
+    
+    def checkpoint(self, on_pause=None, on_resume=None):
+        """
+        Blocks while paused.
+        Returns: False when the run should stop
+        """
+        if self.paused and not self.cancelled:
+            if on_pause:
+                on_pause()
+            self._running.wait()
+            if on_resume and not self.cancelled:
+                on_resume()
+        return not self.cancelled
+
+
+class ChecksumReconciler:
+    """
+    Verifies the job orders a migration run created by comparing them with
+    their DB1 source rows over the mapped columns. The migrated set is split
+    into buckets of bucket_rows emails, and each side hashes a bucket on its
+    own server restricted to those rows by primary key (DB1 falls back to
+    the email when the source table has none). Mismatched buckets are narrowed down to per-email
+    hashes, and only emails whose hashes differ are fetched into Python for a
+    column-level diff. Both sides are cast to the DB2 column type before
+    hashing, so '2024-01-05' matches a DATETIME and '1.5' a DECIMAL(10,2).
+    """
+    INTEGER_TYPES = ('tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint')
+    
+    def __init__(self, db1, db2, column_mapping, migrated_rows, source_key=None,
+                 source_table="Job Order", target_table="job_orders",
+                 email_columns=('Applicant Email Address', 'applicant_email'), bucket_rows=500):
+        """migrated_rows: (normalized email, source key value, DB2 id) per created job order"""
+        self.db1 = db1
+        self.db2 = db2
+        self.pairs = [(src, dst) for src, dst in column_mapping.items() if dst]
+        self.source_key = source_key
+        self.source_table = source_table
+        self.target_table = target_table
+        self.email_columns = email_columns
+        self.bucket_rows = bucket_rows
+        self.target_types = dict(db2.get_table_schema(target_table))
+        
+        self.keys_by_email = {}
+        for email, source_key, target_id in migrated_rows:
+            self.keys_by_email.setdefault(email, []).append((source_key, target_id))
+        self.emails = sorted(self.keys_by_email)
+    
+    def run(self, log):
+        """
+        Returns: dict with bucket counts, per-email results and the report filename
+        """
+        buckets = [self.emails[i:i + self.bucket_rows] for i in range(0, len(self.emails), self.bucket_rows)]
+        log(f"Hashing {len(self.emails):,} migrated emails in {len(buckets)} buckets on DB1 and DB2...", "INFO")
+        
+        mismatched = []
+        for bucket in buckets:
+            if self._bucket_hash(self.db1, 0, bucket) != self._bucket_hash(self.db2, 1, bucket):
+                mismatched.append(bucket)
+        log(f"{len(mismatched)}/{len(buckets)} buckets differ", "WARNING" if mismatched else "SUCCESS")
+        
+        only_source, only_target, changed = [], [], []
+        for bucket in mismatched:
+            source_emails = self._email_hashes(self.db1, 0, bucket)
+            target_emails = self._email_hashes(self.db2, 1, bucket)
+            
+            for email in bucket:
+                if email not in target_emails:
+                    only_source.append(email)
+                elif email not in source_emails:
+                    only_target.append(email)
+                elif source_emails[email] != target_emails[email]:
+                    changed.append(email)
+        
+        if changed:
+            log(f"Fetching rows for {len(changed):,} emails with differing data...", "INFO")
+        diffs = self._diff_rows(changed)
+        
+        result = {
+            'rows': sum(len(keys) for keys in self.keys_by_email.values()),
+            'buckets': len(buckets),
+            'mismatched_buckets': len(mismatched),
+            'only_source': only_source,
+            'only_target': only_target,
+            'diffs': diffs
+        }
+        result['filename'] = self._write_report(result)
+        return result
+    
+    def _typed(self, column, target_type):
+        """Apply the conversion MySQL performs when storing into the DB2 column"""
+        expr = f"`{column}`"
+        base = target_type.split('(')[0].split()[0] if target_type else ''
+        if base in ('datetime', 'timestamp'):
+            return f"CAST({expr} AS DATETIME)"
+        if base in ('date', 'time'):
+            return f"CAST({expr} AS {base.upper()})"
+        if base in ('decimal', 'numeric'):
+            scale = re.search(r',\s*(\d+)\s*\)', target_type)
+            return f"CAST({expr} AS DECIMAL(65, {scale.group(1) if scale else 0}))"
+        if base in self.INTEGER_TYPES:
+            return f"CAST({expr} AS SIGNED)"
+        return expr
+    
+    def _column_expressions(self, side):
+        return [
+            f"NULLIF(TRIM(CAST({self._typed(pair[side], self.target_types.get(pair[1], ''))} AS CHAR)), '')"
+            for pair in self.pairs
+        ]
+    
+    def _email_expression(self, side):
+        return f"LOWER(TRIM(`{self.email_columns[side]}`))"
+    
+    def _restriction(self, side, emails):
+        """WHERE clause and parameters limiting one side to the migrated rows of these emails"""
+        keys = [pair[side] for email in emails for pair in self.keys_by_email[email]]
+        column = (self.source_key if side == 0 else 'id') if None not in keys else None
+        if column:
+            return f"`{column}` IN ({', '.join(['%s'] * len(keys))})", keys
+        return f"{self._email_expression(side)} IN ({', '.join(['%s'] * len(emails))})", list(emails)
+    
+    def _query(self, db, sql, params):
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    
+    def _hashed_rows_sql(self, side, emails):
+        table = self.source_table if side == 0 else self.target_table
+        where, params = self._restriction(side, emails)
+        sql = (
+            f"SELECT {self._email_expression(side)} AS email, "
+            f"{row_hash_sql(self._column_expressions(side))} AS h FROM `{table}` WHERE {where}"
+        )
+        return sql, params
+    
+    def _bucket_hash(self, db, side, emails):
+        sql, params = self._hashed_rows_sql(side, emails)
+        row = self._query(db, f"SELECT COUNT(*), BIT_XOR(h), SUM(h) FROM ({sql}) hashed", params)[0]
+        return tuple(row)
+    
+    def _email_hashes(self, db, side, emails):
+        sql, params = self._hashed_rows_sql(side, emails)
+        rows = self._query(db, f"SELECT email, COUNT(*), BIT_XOR(h), SUM(h) FROM ({sql}) hashed GROUP BY email", params)
+        return {row[0]: tuple(row[1:]) for row in rows}
+    
+    def _fetch_rows(self, db, side, emails):
+        table = self.source_table if side == 0 else self.target_table
+        where, params = self._restriction(side, emails)
+        # Select the same normalized expressions that were hashed, so the diff shows what differed
+        sql = (
+            f"SELECT {self._email_expression(side)}, {', '.join(self._column_expressions(side))} "
+            f"FROM `{table}` WHERE {where}"
+        )
+        rows = {}
+        for row in self._query(db, sql, params):
+            rows.setdefault(row[0], []).append(tuple(self._decode(v) for v in row[1:]))
+        return rows
+    
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, (bytes, bytearray)):
+            return value.decode('utf-8', errors='replace')
+        return value
+    
+    def _diff_rows(self, emails):
+        diffs = []
+        for start in range(0, len(emails), self.bucket_rows):
+            chunk = emails[start:start + self.bucket_rows]
+            source_rows = self._fetch_rows(self.db1, 0, chunk)
+            target_rows = self._fetch_rows(self.db2, 1, chunk)
+            
+            for email in chunk:
+                source = sorted(source_rows.get(email, []), key=repr)
+                target = sorted(target_rows.get(email, []), key=repr)
+                unmatched_source = [row for row in source if row not in target]
+                unmatched_target = [row for row in target if row not in source]
+                
+                columns = []
+                if len(unmatched_source) == 1 and len(unmatched_target) == 1:
+                    for (src, dst), a, b in zip(self.pairs, unmatched_source[0], unmatched_target[0]):
+                        if a != b:
+                            columns.append((src, dst, a, b))
+                
+                diffs.append({
+                    'email': email,
+                    'source_rows': len(source),
+                    'target_rows': len(target),
+                    'columns': columns
+                })
+        return diffs
+    
+    def _write_report(self, result):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"reconciliation_{timestamp}.txt"
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write("=" * 100 + "\n")
+            f.write("CHECKSUM RECONCILIATION (job orders created by the run vs their DB1 source rows)\n")
+            f.write(f"Generated: {datetime.now()}\n")
+            f.write(f"Mapped columns: {len(self.pairs)} | Migrated rows: {result['rows']:,}\n")
+            f.write(f"Buckets: {result['buckets']} | Mismatched: {result['mismatched_buckets']}\n")
+            f.write(f"Only in DB1: {len(result['only_source'])} | Only in DB2: {len(result['only_target'])} | "
+                    f"Differing: {len(result['diffs'])}\n")
+            f.write("=" * 100 + "\n\n")
+            
+            for idx, item in enumerate(result['diffs'], 1):
+                f.write(f"Record #{idx}\n")
+                f.write("-" * 100 + "\n")
+                f.write(f"  Email            : {item['email']}\n")
+                f.write(f"  Rows (DB1 / DB2) : {item['source_rows']} / {item['target_rows']}\n")
+                for src, dst, a, b in item['columns']:
+                    f.write(f"  {src} -> {dst}\n")
+                    f.write(f"      DB1: {a}\n")
+                    f.write(f"      DB2: {b}\n")
+                f.write("\n")
+            
+            if result['only_source']:
+                f.write("ONLY IN DB1\n")
+                f.write("-" * 100 + "\n")
+                for email in result['only_source']:
+                    f.write(f"  {email}\n")
+                f.write("\n")
+            
+            if result['only_target']:
+                f.write("ONLY IN DB2\n")
+                f.write("-" * 100 + "\n")
+                for email in result['only_target']:
+                    f.write(f"  {email}\n")
+        
+        return filename
+
+
+class PreflightAdvisor:
+    """
+    Checks DB1/DB2 before a long run instead of finding problems hours into
+    it. EXPLAINs the exact lookup and insert statements the engine issues,
+    inspects indexes and triggers on job_orders and the server settings that
+    matter for batched writes, and times sampled lookups and round trips to
+    estimate the total runtime.
+    """
+    SEVERITIES = ('HIGH', 'MEDIUM', 'INFO')
+    VARIABLES = ('max_allowed_packet', 'innodb_flush_log_at_trx_commit', 'wait_timeout')
+    
+    def __init__(self, db1, db2, map_row, source_key=None, batch_size=500, max_batch=2000,
+                 sample_size=50, source_table="Job Order", target_table="job_orders",
+                 email_columns=('Applicant Email Address', 'applicant_email')):
+        self.db1 = db1
+        self.db2 = db2
+        self.map_row = map_row
+        self.source_key = source_key
+        self.batch_size = batch_size
+        self.max_batch = max_batch
+        self.sample_size = sample_size
+        self.source_table = source_table
+        self.target_table = target_table
+        self.email_columns = email_columns
+        self.findings = []
+    
+    def run(self, log):
+        """
+        Returns: dict with 'findings', 'timings', 'estimate' (seconds) and the report filename
+        """
+        self.findings = []
+        total = self.db1.get_approx_row_count(self.source_table)
+        
+        log("Sampling source rows and round-trip time...", "INFO")
+        timings = {'rows': total, 'rtt': self._time_round_trip()}
+        sample = self._sample_source(timings, total)
+        mapped = [jo_data for jo_data in (self.map_row(row) for row in sample) if jo_data]
+        
+        log("Checking the job_orders lookup...", "INFO")
+        indexes = self._indexes()
+        self._check_lookup(sample, indexes, timings)
+        
+        log("Checking inserts into job_orders...", "INFO")
+        self._check_insert(mapped)
+        self._check_write_overhead(indexes)
+        
+        log("Checking server settings...", "INFO")
+        self._check_variables(mapped, timings)
+        
+        timings['batches'] = -(-total // self.batch_size) if total else 0
+        estimate = (
+            total * timings.get('lookup', 0)
+            + timings['batches'] * (timings.get('read', 0) + 2 * timings['rtt'])
+        )
+        
+        levels = {'HIGH': "ERROR", 'MEDIUM': "WARNING", 'INFO': "INFO"}
+        for finding in self.findings:
+            log(f"{finding['area']}: {finding['message']}", levels[finding['severity']])
+        
+        result = {'findings': self.findings, 'timings': timings, 'estimate': estimate}
+        result['filename'] = self._write_report(result)
+        return result
+    
+    def _add(self, severity, area, message, fix=None):
+        self.findings.append({'severity': severity, 'area': area, 'message': message, 'fix': fix})
+    
+    def _query(self, db, sql, params=None):
+        cursor = db.connection.cursor(dictionary=True)
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    
+    def _time_round_trip(self, samples=5):
+        times = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            self._query(self.db2, "SELECT 1")
+            times.append(time.perf_counter() - start)
+        return sorted(times)[len(times) // 2]
+    
+    def _sample_source(self, timings, total):
+        order = f" ORDER BY `{self.source_key}`" if self.source_key else ""
+        
+        start = time.perf_counter()
+        sample = self._query(self.db1, f"SELECT * FROM `{self.source_table}`{order} LIMIT {self.sample_size}")
+        first = time.perf_counter() - start
+        
+        # LIMIT/OFFSET reads and discards every skipped row, so the last
+        # batches of a run cost more than the first
+        deep_offset = max(0, total - self.batch_size)
+        start = time.perf_counter()
+        self._query(self.db1, f"SELECT * FROM `{self.source_table}`{order} LIMIT {self.batch_size} OFFSET {deep_offset}")
+        deep = time.perf_counter() - start
+        
+        timings['read'] = (first * self.batch_size / max(1, len(sample)) + deep) / 2
+        
+        if not self.source_key:
+            self._add('MEDIUM', 'source read',
+                      f"`{self.source_table}` has no single-column primary key; batches are read without "
+                      f"a stable order, so a cancelled run cannot be resumed reliably",
+                      f"ALTER TABLE `{self.source_table}` ADD COLUMN id INT AUTO_INCREMENT PRIMARY KEY")
+        if deep > 5 * max(first, timings['rtt']) and deep > 0.5:
+            self._add('MEDIUM', 'source read',
+                      f"The last batch read (OFFSET {deep_offset:,}) takes {deep * 1000:.0f} ms vs "
+                      f"{first * 1000:.0f} ms for the first; deep OFFSET pagination slows the run down as it progresses",
+                      "Use --snapshot to read the source from a local copy")
+        return sample
+    
+    def _indexes(self):
+        indexes = {}
+        for row in self._query(self.db2, f"SHOW INDEX FROM `{self.target_table}`"):
+            column = row.get('Column_name') or row.get('Expression') or ''
+            indexes.setdefault(row['Key_name'], []).append(column)
+        return indexes
+    
+    def _check_lookup(self, sample, indexes, timings):
+        email_column = self.email_columns[1]
+        emails = [str(row[self.email_columns[0]]).strip().lower() for row in sample
+                  if row.get(self.email_columns[0]) and str(row[self.email_columns[0]]).strip()]
+        if not emails:
+            self._add('INFO', 'lookup', "No source emails in the sample; lookup not timed")
+            return
+        
+        plan = self._query(self.db2, "EXPLAIN " + JOB_ORDER_LOOKUP_SQL, (emails[0],))
+        step = plan[0] if plan else {}
+        
+        plain_index = [name for name, columns in indexes.items() if columns and columns[0] == email_column]
+        functional_index = [name for name, columns in indexes.items()
+                            if columns and email_column in columns[0] and columns[0] != email_column]
+        
+        fix = (f"CREATE INDEX idx_job_orders_email_norm ON {self.target_table} "
+               f"((LOWER(TRIM({email_column})))) -- MySQL 8.0.13+")
+        if step.get('type') == 'ALL':
+            scanned = int(step.get('rows') or 0)
+            if plain_index:
+                self._add('HIGH', 'lookup',
+                          f"Index {plain_index[0]} on {email_column} is unused: LOWER(TRIM({email_column})) in the "
+                          f"lookup defeats it, so every source row full-scans ~{scanned:,} job_orders rows", fix)
+            else:
+                self._add('HIGH', 'lookup',
+                          f"No index on {email_column}; every source row full-scans ~{scanned:,} job_orders rows", fix)
+        elif step.get('key'):
+            self._add('INFO', 'lookup', f"Lookup uses index {step['key']} (type {step.get('type')})")
+        
+        if not plain_index and not functional_index and step.get('type') != 'ALL':
+            self._add('MEDIUM', 'lookup', f"No index leads with {email_column}", fix)
+        
+        times = []
+        cursor = self.db2.connection.cursor(dictionary=True)
+        for email in emails:
+            start = time.perf_counter()
+            cursor.execute(JOB_ORDER_LOOKUP_SQL, (email,))
+            cursor.fetchall()
+            times.append(time.perf_counter() - start)
+        cursor.close()
+        timings['lookup'] = sorted(times)[len(times) // 2]
+        timings['lookups_sampled'] = len(times)
+    
+    def _check_insert(self, mapped):
+        if not mapped:
+            self._add('INFO', 'insert', "No mapped source rows in the sample; insert not checked")
+            return
+        
+        widest = max(mapped, key=len)
+        query = job_order_insert_sql(widest.keys())
+        try:
+            self._query(self.db2, "EXPLAIN " + query, tuple(widest.values()))
+        except Error as e:
+            self._add('HIGH', 'insert', f"The insert statement is rejected by DB2: {e}",
+                      "Fix the column mapping before migrating")
+    
+    def _check_write_overhead(self, indexes):
+        secondary = sorted(name for name in indexes if name != 'PRIMARY')
+        if len(secondary) >= 4:
+            self._add('MEDIUM', 'insert',
+                      f"{len(secondary)} secondary indexes on {self.target_table} are updated by every insert: "
+                      f"{', '.join(secondary)}",
+                      "Drop unneeded indexes for the migration window and rebuild them afterwards")
+        elif secondary:
+            self._add('INFO', 'insert', f"Secondary indexes on {self.target_table}: {', '.join(secondary)}")
+        
+        triggers = self._query(self.db2, "SHOW TRIGGERS LIKE %s", (self.target_table,))
+        for trigger in triggers:
+            self._add('MEDIUM', 'insert',
+                      f"Trigger {trigger['Trigger']} ({trigger['Timing']} {trigger['Event']}) runs once per "
+                      f"inserted row, even inside multi-row INSERTs",
+                      "Check that the trigger is needed for migrated rows")
+    
+    def _check_variables(self, mapped, timings):
+        placeholders = ', '.join(['%s'] * len(self.VARIABLES))
+        rows = self._query(self.db2, f"SHOW VARIABLES WHERE Variable_name IN ({placeholders})", self.VARIABLES)
+        variables = {row['Variable_name']: row['Value'] for row in rows}
+        timings['variables'] = variables
+        
+        packet = int(variables.get('max_allowed_packet') or 0)
+        if packet and mapped:
+            row_bytes = sum(
+                sum(len(str(v).encode('utf-8')) + 4 for v in jo_data.values()) for jo_data in mapped
+            ) / len(mapped)
+            batch_bytes = int(row_bytes * self.max_batch)
+            if batch_bytes > packet // 2:
+                self._add('HIGH' if batch_bytes > packet else 'MEDIUM', 'settings',
+                          f"A {self.max_batch}-row batch is ~{batch_bytes:,} bytes against max_allowed_packet "
+                          f"{packet:,}; large batches may fail with 'packet too large'",
+                          "Lower the maximum batch size or raise max_allowed_packet")
+        
+        if str(variables.get('innodb_flush_log_at_trx_commit')) == '1':
+            self._add('INFO', 'settings',
+                      "innodb_flush_log_at_trx_commit=1 flushes the redo log on every batch commit; "
+                      "larger batches amortize it",
+                      "If the DBA accepts the durability trade-off, set it to 2 for the migration window")
+        
+        wait_timeout = int(variables.get('wait_timeout') or 0)
+        if wait_timeout and wait_timeout < 600:
+            self._add('MEDIUM', 'settings',
+                      f"wait_timeout is {wait_timeout}s; a paused run or a long throttle pause idles the "
+                      f"connection past it and the next batch fails with 'server has gone away'",
+                      "SET SESSION wait_timeout = 28800 or keep pauses short")
+    
+    def _write_report(self, result):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"preflight_{timestamp}.txt"
+        timings = result['timings']
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write("=" * 100 + "\n")
+            f.write("PREFLIGHT CHECK (DB1 Job Order -> DB2 job_orders)\n")
+            f.write(f"Generated: {datetime.now()}\n")
+            f.write(f"Source rows (approx): {timings['rows']:,} | Batches: {timings['batches']:,}\n")
+            f.write(f"Round trip: {timings['rtt'] * 1000:.1f} ms | "
+                    f"Lookup: {timings.get('lookup', 0) * 1000:.1f} ms | "
+                    f"Batch read: {timings.get('read', 0) * 1000:.1f} ms\n")
+            f.write(f"Estimated runtime: {format_duration(result['estimate'])} "
+                    f"(rows x lookup + batches x (read + insert + commit))\n")
+            for name, value in timings.get('variables', {}).items():
+                f.write(f"{name}: {value}\n")
+            f.write("=" * 100 + "\n\n")
+            
+            for severity in self.SEVERITIES:
+                items = [item for item in result['findings'] if item['severity'] == severity]
+                if not items:
+                    continue
+                f.write(f"{severity}\n")
+                f.write("-" * 100 + "\n")
+                for item in items:
+                    f.write(f"  [{item['area']}] {item['message']}\n")
+                    if item['fix']:
+                        f.write(f"      Fix: {item['fix']}\n")
+                f.write("\n")
+        
+        return filename
+
+
+class TokenBucket:
+    """Thread-safe token bucket; rate in bytes per second, 0 for unlimited"""
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate * 0.05))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def consume(self, amount):
+        if not self.rate:
+            return
+        
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Oversized sends go into debt so later callers wait behind them
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        
+        if wait > 0:
+            time.sleep(wait)
+
+
+class LatencyProxy:
+    """
+    Local TCP proxy that makes a localhost database behave like one across a
+    WAN link. Each direction adds half the round-trip latency plus uniform
+    jitter and is capped by a shared token bucket. Data is queued with its
+    due time rather than held per chunk, so pipelined traffic keeps flowing
+    the way it would over a real link, and byte order is always preserved.
+    """
+    CHUNK = 65536
+    
+    def __init__(self, target_host, target_port, latency=0.0, jitter=0.0, bandwidth=0,
+                 listen_host="127.0.0.1", listen_port=0):
+        self.target = (target_host, target_port)
+        self.latency = latency
+        self.jitter = jitter
+        self.listen = (listen_host, listen_port)
+        self.buckets = {'up': TokenBucket(bandwidth), 'down': TokenBucket(bandwidth)}
+        self.bytes = Counter()
+        self.address = None
+        self._server = None
+        self._sockets = []
+        self._stopped = threading.Event()
+    
+    def start(self):
+        """Returns: (host, port) to connect to instead of the target"""
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(self.listen)
+        self._server.listen(16)
+        self._server.settimeout(0.2)
+        self.address = self._server.getsockname()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self.address
+    
+    def stop(self):
+        self._stopped.set()
+        for sock in [self._server] + self._sockets:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._sockets = []
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            try:
+                client, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            
+            try:
+                upstream = socket.create_connection(self.target)
+            except OSError:
+                client.close()
+                continue
+            
+            for sock in (client, upstream):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self._sockets.append(sock)
+            self._pipe(client, upstream, 'up')
+            self._pipe(upstream, client, 'down')
+    
+    def _pipe(self, source, destination, direction):
+        pending = queue.Queue()
+        
+        def read():
+            last_due = 0.0
+            while True:
+                try:
+                    data = source.recv(self.CHUNK)
+                except OSError:
+                    data = b''
+                if not data:
+                    pending.put((last_due, None))
+                    return
+                delay = self.latency / 2 + random.uniform(-self.jitter, self.jitter)
+                # Jitter must never reorder bytes within one TCP stream
+                last_due = max(last_due, time.monotonic() + max(0.0, delay))
+                pending.put((last_due, data))
+        
+        def write():
+            while True:
+                due, data = pending.get()
+                wait = due - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                try:
+                    if data is None:
+                        destination.shutdown(socket.SHUT_WR)
+                        return
+                    self.buckets[direction].consume(len(data))
+                    destination.sendall(data)
+                    self.bytes[direction] += len(data)
+                except OSError:
+                    return
+        
+        threading.Thread(target=read, daemon=True).start()
+        threading.Thread(target=write, daemon=True).start()
+
+
+class MultipleMatchResolver:
+    """
+    Settles 'multiple' matches without manual review. For each source row the
+    candidate job_orders rows are ranked by RULES in the configured order,
+    with the lowest id as the final tie-break. The plan fills only the empty
+    columns of the winner from the mapped source row and never touches the
+    losers; text columns count '' as empty, other columns only NULL. Legacy
+    text dates are converted for DATETIME/DATE columns when the plan is
+    built. Plans are written as JSON for review and applied in batches
+    through a temporary table and one UPDATE ... JOIN per batch. Each row's
+    previous values go to an undo log before the batch commits. A batch DB2
+    rejects for a value is split until the failing job orders are isolated;
+    those are skipped and listed in the result.
+    """
+    RULES = ('matching_modem_sn', 'has_date_installed', 'latest_timestamp')
+    TEXT_TYPES = ('char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext', 'enum', 'set')
+    PLAN_TABLE = "job_order_resolution_plan"
+    
+    def __init__(self, db2, rules=RULES, batch_size=500, target_table="job_orders"):
+        unknown = [rule for rule in rules if rule not in self.RULES]
+        if unknown:
+            raise ValueError(f"Unknown resolution rule: {', '.join(unknown)} (choose from {', '.join(self.RULES)})")
+        self.db2 = db2
+        self.rules = tuple(rules)
+        self.batch_size = batch_size
+        self.target_table = target_table
+    
+    @staticmethod
+    def _clean(value):
+        if value is None:
+            return ''
+        return str(value).strip()
+    
+    def _rule_matching_modem_sn(self, candidate, jo_data):
+        source_sn = self._clean(jo_data.get('modem_router_sn')).lower()
+        return bool(source_sn) and self._clean(candidate.get('modem_router_sn')).lower() == source_sn
+    
+    def _rule_has_date_installed(self, candidate, jo_data):
+        return bool(self._clean(candidate.get('date_installed')))
+    
+    def _rule_latest_timestamp(self, candidate, jo_data):
+        return parse_timestamp(candidate.get('timestamp')) or datetime.min
+    
+    def _rank(self, candidate, jo_data):
+        ranks = tuple(getattr(self, f"_rule_{rule}")(candidate, jo_data) for rule in self.rules)
+        return ranks + (-int(candidate['id']),)
+    
+    def _deciding_rule(self, ranked):
+        if len(ranked) < 2:
+            return None
+        best, runner_up = ranked[0][0], ranked[1][0]
+        for rule, a, b in zip(self.rules + ('lowest_id',), best, runner_up):
+            if a != b:
+                return rule
+        return 'lowest_id'
+    
+    def build_plan(self, multiple_matches):
+        """
+        Returns: plan dict with one entry per source row and the merged fills per winning job order
+        """
+        entries = []
+        fills = {}
+        types = dict(self.db2.get_table_schema(self.target_table)) if self.db2 is not None else {}
+        
+        for item in multiple_matches:
+            jo_data = item.get('jo_data') or {}
+            ranked = sorted(
+                ((self._rank(candidate, jo_data), candidate) for candidate in item['matches']),
+                key=lambda pair: pair[0], reverse=True
+            )
+            winner = ranked[0][1]
+            winner_id = int(winner['id'])
+            
+            # A job order picked by several source rows is filled by the first one, column by column
+            fill = fills.setdefault(winner_id, {})
+            added = {}
+            unparsed = []
+            for column, value in jo_data.items():
+                if column == 'id' or column in fill or self._clean(winner.get(column)):
+                    continue
+                value = self._target_value(value, types.get(column))
+                if value is None:
+                    unparsed.append(column)
+                    continue
+                fill[column] = added[column] = value
+            
+            entries.append({
+                'email': item['db1_data']['email'],
+                'winner_id': winner_id,
+                'loser_ids': [int(candidate['id']) for _, candidate in ranked[1:]],
+                'decided_by': self._deciding_rule(ranked),
+                'fill': added,
+                'unparsed': unparsed
+            })
+        
+        return {
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'rules': list(self.rules),
+            'entries': entries,
+            'updates': {str(job_order_id): fill for job_order_id, fill in fills.items() if fill}
+        }
+    
+    @staticmethod
+    def _target_value(value, column_type):
+        """
+        Returns: the value as the DB2 column accepts it, or None for a date that cannot be parsed
+        """
+        base = (column_type or 'text').split('(')[0].split()[0]
+        if base in ('datetime', 'timestamp', 'date'):
+            parsed = parse_timestamp(value)
+            if parsed is None:
+                return None
+            return parsed.strftime('%Y-%m-%d' if base == 'date' else '%Y-%m-%d %H:%M:%S')
+        return value
+    
+    def write_plan(self, plan):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"resolution_plan_{timestamp}.json"
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, indent=2, default=str)
+        return filename
+    
+    def apply(self, plan_file, log):
+        """
+        Applies the 'updates' section of a (reviewed) plan file.
+        Returns: dict with 'job_orders', 'columns', 'batches', the undo log
+        filename and 'failed' (job orders DB2 rejected, with the error)
+        """
+        with open(plan_file, encoding='utf-8') as f:
+            updates = [(int(job_order_id), fill) for job_order_id, fill in json.load(f)['updates'].items() if fill]
+        
+        columns = sorted({column for _, fill in updates for column in fill})
+        result = {'job_orders': 0, 'columns': 0, 'batches': 0, 'undo': None, 'failed': []}
+        if not updates:
+            log("Plan has nothing to fill", "INFO")
+            return result
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        result['undo'] = f"resolution_undo_{timestamp}.jsonl"
+        types = dict(self.db2.get_table_schema(self.target_table))
+        
+        cursor = self.db2.connection.cursor(dictionary=True)
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {self.PLAN_TABLE}")
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {self.PLAN_TABLE} (job_order_id INT PRIMARY KEY, "
+            + ", ".join(f"`{column}` TEXT NULL" for column in columns) + ")"
+        )
+        assignments = ', '.join(self._fill_assignment(column, types.get(column)) for column in columns)
+        
+        with open(result['undo'], 'w', encoding='utf-8') as undo:
+            for start in range(0, len(updates), self.batch_size):
+                batch = updates[start:start + self.batch_size]
+                try:
+                    self._apply_batch(cursor, batch, columns, assignments, undo, result)
+                except Error:
+                    self.db2.connection.rollback()
+                    cursor.close()
+                    raise
+                
+                result['batches'] += 1
+                log(f"Batch {result['batches']}: filled {result['job_orders']:,}/{len(updates):,} job orders", "INFO")
+        
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {self.PLAN_TABLE}")
+        cursor.close()
+        if result['failed']:
+            log(f"{len(result['failed']):,} job orders were rejected by DB2 and left unchanged", "WARNING")
+        return result
+    
+    def _apply_batch(self, cursor, batch, columns, assignments, undo, result):
+        """
+        Fills one batch in its own transaction. A batch rejected for a value
+        (ROW_DATA_ERRORS) is rolled back and split in half until the failing
+        job orders are isolated; any other error is re-raised.
+        """
+        column_list = ', '.join(f"`{column}`" for column in columns)
+        id_list = ', '.join(str(job_order_id) for job_order_id, _ in batch)
+        fills = dict(batch)
+        
+        try:
+            cursor.execute(f"SELECT id, {column_list} FROM {self.target_table} WHERE id IN ({id_list}) FOR UPDATE")
+            before_rows = []
+            for row in cursor.fetchall():
+                before = {'id': row['id']}
+                before.update((column, row[column]) for column in fills[row['id']])
+                before_rows.append(before)
+            
+            cursor.execute(f"DELETE FROM {self.PLAN_TABLE}")
+            cursor.executemany(
+                f"INSERT INTO {self.PLAN_TABLE} (job_order_id, {column_list}) "
+                f"VALUES ({', '.join(['%s'] * (len(columns) + 1))})",
+                [(job_order_id,) + tuple(fill.get(column) for column in columns) for job_order_id, fill in batch]
+            )
+            cursor.execute(
+                f"UPDATE {self.target_table} jo JOIN {self.PLAN_TABLE} p ON p.job_order_id = jo.id "
+                f"SET {assignments}"
+            )
+            
+            for before in before_rows:
+                undo.write(json.dumps(before, default=str) + "\n")
+            undo.flush()
+            self.db2.connection.commit()
+        except Error as e:
+            if e.errno not in ROW_DATA_ERRORS:
+                raise
+            self.db2.connection.rollback()
+            
+            if len(batch) == 1:
+                result['failed'].append({'id': batch[0][0], 'error': getattr(e, 'msg', None) or str(e)})
+                return
+            
+            mid = len(batch) // 2
+            self._apply_batch(cursor, batch[:mid], columns, assignments, undo, result)
+            self._apply_batch(cursor, batch[mid:], columns, assignments, undo, result)
+            return
+        
+        result['job_orders'] += len(batch)
+        result['columns'] += sum(len(fill) for _, fill in batch)
+    
+    def _fill_assignment(self, column, column_type):
+        # NULLIF(col, '') on a DATETIME or numeric column compares against a
+        # string and breaks under strict mode, so only text columns treat '' as empty
+        base = (column_type or 'text').split('(')[0].split()[0]
+        current = f"NULLIF(jo.`{column}`, '')" if base in self.TEXT_TYPES else f"jo.`{column}`"
+        return f"jo.`{column}` = COALESCE({current}, p.`{column}`)"
+    
+    def undo(self, undo_file, log):
+        """
+        Restores the values saved in an undo log.
+        Returns: number of job orders restored
+        """
+        groups = {}
+        with open(undo_file, encoding='utf-8') as f:
+            for line in f:
+                row = json.loads(line)
+                job_order_id = row.pop('id')
+                groups.setdefault(tuple(row.keys()), []).append(tuple(row.values()) + (job_order_id,))
+        
+        restored = 0
+        cursor = self.db2.connection.cursor()
+        try:
+            for columns, values in groups.items():
+                assignments = ', '.join(f"`{column}` = %s" for column in columns)
+                for start in range(0, len(values), self.batch_size):
+                    cursor.executemany(
+                        f"UPDATE {self.target_table} SET {assignments} WHERE id = %s",
+                        values[start:start + self.batch_size]
+                    )
+                    self.db2.connection.commit()
+                    restored += len(values[start:start + self.batch_size])
+        except Error:
+            self.db2.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        
+        log(f"Restored {restored:,} job orders from {undo_file}", "SUCCESS")
+        return restored
+
+
+class EmailGrouper:
+    """
+    Buckets source rows by normalized Applicant Email Address before
+    matching, so each email is looked up once and the same row wins
+    regardless of read order. Rows are hash-partitioned by CRC32 of the
+    email. Until memory_rows is exceeded the partitions stay in memory;
+    after that they are spilled to pickle files in a temporary directory.
+    Groups come out partition by partition, sorted by email within each, so
+    the order is identical whether or not the data spilled and a group count
+    is a stable resume position. Rows without an email are never grouped.
+    """
+    POLICIES = ('newest_timestamp', 'most_complete')
+    
+    def __init__(self, policy='newest_timestamp', partitions=64, memory_rows=200000,
+                 email_column='Applicant Email Address', timestamp_column='Timestamp'):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown group policy: {policy} (choose from {', '.join(self.POLICIES)})")
+        self.policy = policy
+        self.partitions = partitions
+        self.memory_rows = memory_rows
+        self.email_column = email_column
+        self.timestamp_column = timestamp_column
+        self.rows = 0
+        self.directory = None
+        self._buffers = [[] for _ in range(partitions)]
+        self._buffered = 0
+        self._ungrouped = []
+    
+    @property
+    def spilled(self):
+        return self.directory is not None
+    
+    def add(self, row):
+        email = str(row.get(self.email_column) or '').strip().lower()
+        # The sequence number breaks policy ties in favour of the first row read
+        entry = (email, self.rows, row)
+        self.rows += 1
+        
+        if not email:
+            self._ungrouped.append(entry)
+            return
+        
+        self._buffers[zlib.crc32(email.encode('utf-8')) % self.partitions].append(entry)
+        self._buffered += 1
+        if self._buffered >= self.memory_rows:
+            self._spill()
+    
+    def _partition_path(self, index):
+        return os.path.join(self.directory, f"partition_{index:03d}.pkl")
+    
+    def _spill(self):
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix="job_order_groups_")
+        
+        for index, buffer in enumerate(self._buffers):
+            if buffer:
+                with open(self._partition_path(index), 'ab') as f:
+                    pickle.dump(buffer, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._buffers = [[] for _ in range(self.partitions)]
+        self._buffered = 0
+    
+    def _load_partition(self, index):
+        entries = []
+        if self.directory is not None and os.path.exists(self._partition_path(index)):
+            with open(self._partition_path(index), 'rb') as f:
+                while True:
+                    try:
+                        entries.extend(pickle.load(f))
+                    except EOFError:
+                        break
+        entries.extend(self._buffers[index])
+        self._buffers[index] = []
+        return entries
+    
+    def _completeness(self, row):
+        return sum(1 for value in row.values() if value is not None and str(value).strip() != '')
+    
+    def _timestamp(self, row):
+        return parse_timestamp(row.get(self.timestamp_column)) or datetime.min
+    
+    def _rank(self, entry):
+        _, sequence, row = entry
+        if self.policy == 'most_complete':
+            return (self._completeness(row), self._timestamp(row), -sequence)
+        return (self._timestamp(row), self._completeness(row), -sequence)
+    
+    def groups(self):
+        """
+        Yields (winner_row, loser_rows) per email, then each email-less row on its own.
+        """
+        for index in range(self.partitions):
+            by_email = {}
+            for entry in self._load_partition(index):
+                by_email.setdefault(entry[0], []).append(entry)
+            
+            for email in sorted(by_email):
+                ranked = sorted(by_email[email], key=self._rank, reverse=True)
+                yield ranked[0][2], [row for _, _, row in ranked[1:]]
+        
+        for _, _, row in self._ungrouped:
+            yield row, []
+    
+    def close(self):
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+
+class MigrationProfiler:
+    """
+    Profiling mode for a migration run. CPU time and allocations are charged
+    to the active phase (read, match, transform, insert, export): each phase
+    has its own cProfile.Profile and tracemalloc counters, and entering a
+    nested phase pauses the outer one. A sampler thread records the worker
+    stack for a speedscope flame graph and the process RSS over time.
+    """
+    PHASES = ('read', 'match', 'transform', 'insert', 'export')
+    
+    def __init__(self, directory="profiles", sample_interval=0.01, memory_interval=1.0):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.directory = directory
+        self.prefix = os.path.join(directory, f"migration_{timestamp}")
+        self.sample_interval = sample_interval
+        self.memory_interval = memory_interval
+        
+        self.stats = {name: {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'alloc': 0, 'peak': 0} for name in self.PHASES}
+        self.memory = []
+        self._profiles = {name: cProfile.Profile() for name in self.PHASES}
+        self._stack = []
+        self._frames = {}
+        self._samples = []
+        self._weights = []
+        self._thread_id = None
+        self._started = None
+        self._stopped = threading.Event()
+        self._sampler = None
+    
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._started = time.perf_counter()
+        tracemalloc.start()
+        self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+        self._sampler.start()
+    
+    @contextmanager
+    def phase(self, name):
+        if self._stack:
+            self._stop_clock(self._stack[-1])
+        
+        entry = {'name': name}
+        self.stats[name]['calls'] += 1
+        self._stack.append(entry)
+        self._start_clock(entry)
+        try:
+            yield
+        finally:
+            self._stop_clock(self._stack.pop())
+            if self._stack:
+                self._start_clock(self._stack[-1])
+    
+    def _start_clock(self, entry):
+        entry['wall'] = time.perf_counter()
+        entry['cpu'] = time.thread_time()
+        entry['traced'] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self._profiles[entry['name']].enable()
+    
+    def _stop_clock(self, entry):
+        self._profiles[entry['name']].disable()
+        current, peak = tracemalloc.get_traced_memory()
+        stats = self.stats[entry['name']]
+        stats['wall'] += time.perf_counter() - entry['wall']
+        stats['cpu'] += time.thread_time() - entry['cpu']
+        stats['alloc'] += current - entry['traced']
+        stats['peak'] = max(stats['peak'], peak - entry['traced'])
+    
+    @staticmethod
+    def _rss_bytes():
+        if psutil is not None:
+            return psutil.Process().memory_info().rss
+        if resource is not None:
+            # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == 'darwin' else peak * 1024
+        return None
+    
+    def _sample_loop(self):
+        last_sample = time.perf_counter()
+        next_memory = last_sample
+        
+        while not self._stopped.wait(self.sample_interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_name, code.co_filename, code.co_firstlineno)
+                stack.append(self._frames.setdefault(key, len(self._frames)))
+                frame = frame.f_back
+            
+            entries = list(self._stack)
+            phase = entries[-1]['name'] if entries else 'other'
+            stack.append(self._frames.setdefault((f"[{phase}]", "", 0), len(self._frames)))
+            
+            self._samples.append(stack[::-1])
+            self._weights.append(now - last_sample)
+            last_sample = now
+            
+            if now >= next_memory:
+                self.memory.append((now - self._started, self._rss_bytes(), tracemalloc.get_traced_memory()[0]))
+                next_memory = now + self.memory_interval
+    
+    def stop(self):
+        """
+        Stop profiling and write the dumps.
+        Returns: list of files written
+        """
+        while self._stack:
+            self._stop_clock(self._stack.pop())
+        
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        
+        elapsed = time.perf_counter() - self._started
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        
+        profiled = [name for name in self.PHASES if self.stats[name]['calls']]
+        for name in profiled:
+            path = f"{self.prefix}_{name}.prof"
+            self._profiles[name].dump_stats(path)
+            files.append(path)
+        
+        if profiled:
+            combined = pstats.Stats(*[self._profiles[name] for name in profiled])
+            path = f"{self.prefix}.prof"
+            combined.dump_stats(path)
+            files.append(path)
+        
+        path = f"{self.prefix}.speedscope.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self._speedscope(elapsed), f)
+        files.append(path)
+        
+        path = f"{self.prefix}_summary.txt"
+        with open(path, 'w', encoding='utf-8') as f:
+            self._write_summary(f, elapsed, snapshot)
+        files.append(path)
+        
+        return files
+    
+    def _speedscope(self, elapsed):
+        frames = [None] * len(self._frames)
+        for (name, filename, line), idx in self._frames.items():
+            frames[idx] = {'name': name, 'file': filename, 'line': line} if filename else {'name': name}
+        
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': 'Job Order Migration',
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': elapsed,
+                'samples': self._samples,
+                'weights': self._weights
+            }],
+            'name': os.path.basename(self.prefix),
+            'exporter': 'job_order_migration'
+        }
+    
+    def _write_summary(self, f, elapsed, snapshot):
+        f.write("=" * 100 + "\n")
+        f.write("MIGRATION PROFILE\n")
+        f.write(f"Generated: {datetime.now()}\n")
+        f.write(f"Elapsed: {elapsed:.2f}s\n")
+        f.write("=" * 100 + "\n\n")
+        
+        f.write(f"{'Phase':<12}{'Calls':>12}{'Wall (s)':>12}{'CPU (s)':>12}{'Net Alloc (KB)':>18}{'Peak (KB)':>14}\n")
+        f.write("-" * 100 + "\n")
+        for name in self.PHASES:
+            stats = self.stats[name]
+            f.write(
+                f"{name:<12}{stats['calls']:>12,}{stats['wall']:>12.2f}{stats['cpu']:>12.2f}"
+                f"{stats['alloc'] / 1024:>18,.1f}{stats['peak'] / 1024:>14,.1f}\n"
+            )
+        other = elapsed - sum(stats['wall'] for stats in self.stats.values())
+        f.write(f"{'other':<12}{'':>12}{other:>12.2f}\n\n")
+        
+        rss_values = [rss for _, rss, _ in self.memory if rss is not None]
+        f.write(f"Peak RSS: {max(rss_values) / 1048576:,.1f} MB\n\n" if rss_values else "Peak RSS: unavailable\n\n")
+        
+        f.write("MEMORY SNAPSHOTS\n")
+        f.write("-" * 100 + "\n")
+        for offset, rss, traced in self.memory:
+            rss_text = f"{rss / 1048576:,.1f} MB" if rss is not None else "n/a"
+            f.write(f"  {offset:>8.1f}s  RSS {rss_text:>12}  traced {traced / 1048576:,.1f} MB\n")
+        f.write("\n")
+        
+        f.write("TOP ALLOCATION SITES\n")
+        f.write("-" * 100 + "\n")
+        for stat in snapshot.statistics('lineno')[:25]:
+            f.write(f"  {stat}\n")
+
+
+class ConsoleReporter:
+    """Stands in for TransferModal in headless runs and prints to stdout"""
+    def __init__(self):
+        self.state = "LOADING"
+        self.result = None
+    
+    def enqueue(self, message, level="INFO"):
+        if message == "__SUCCESS__":
+            self.state = "SUCCESS"
+            self.result = level
+            print("=" * 50)
+            for key, value in level.items():
+                if isinstance(value, int):
+                    print(f"  {key:<20} : {value:,}")
+            if 'assets' in level:
+                print(f"  {'broken links':<20} : {len(level['assets']['broken']):,}")
+            if 'reconciliation' in level:
+                print(f"  {'reconciliation':<20} : {level['reconciliation']['filename']}")
+            print("=" * 50)
+        elif message == "__FAILED__":
+            self.state = "FAILED"
+            self.result = level
+            print(f"[ERROR] {level}")
+        elif message == "__CANCELLED__":
+            self.state = "CANCELLED"
+            self.result = level
+            print(f"[WARNING] Cancelled after {level['unit']} {level['position']:,}; "
+                  f"resume with --start-offset {level['position']}")
+        elif message == "__VERIFIED__":
+            self.state = "SUCCESS"
+            self.result = level
+            print(f"[SUCCESS] Verification report: {level['filename']}")
+        elif message == "__RESOLVED__":
+            self.state = "SUCCESS"
+            self.result = level
+            print(f"[SUCCESS] Filled {level['job_orders']:,} job orders ({level['columns']:,} columns); "
+                  f"undo log: {level['undo'] or 'none'}")
+            for item in level['failed']:
+                print(f"[WARNING] Job order {item['id']} rejected: {item['error']}")
+        elif message == "__PREFLIGHT__":
+            self.state = "SUCCESS"
+            self.result = level
+            print(f"[SUCCESS] Estimated runtime {format_duration(level['estimate'])}; "
+                  f"preflight report: {level['filename']}")
+        else:
+            print(f"[{level}] {message}")
+
+
+class AssetValidator:
+    """
+    Checks migrated image and contract links in the background. Every
+    distinct URL is requested once on a bounded thread pool (HEAD, falling
+    back to a one-byte GET for hosts that refuse HEAD) and the result is
+    cached by URL. The insert path only submits URLs and never waits on them.
+    """
+    URL_COLUMNS = (
+        'contract_link', 'client_signature_url', 'setup_image_url', 'speedtest_image_url',
+        'signed_contract_image_url', 'box_reading_image_url', 'router_reading_image_url'
+    )
+    HEAD_REFUSED = (403, 405, 501)
+    
+    def __init__(self, columns=URL_COLUMNS, max_workers=16, timeout=10):
+        self.columns = columns
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asset-check")
+        self._lock = threading.Lock()
+        self._results = {}
+        self._references = []
+    
+    def submit(self, jo_data, email):
+        for column in self.columns:
+            value = jo_data.get(column)
+            if value is None or str(value).strip() == '':
+                continue
+            
+            url = str(value).strip()
+            with self._lock:
+                if url not in self._results:
+                    self._results[url] = self._executor.submit(self.check, url)
+                self._references.append((column, url, email))
+    
+    def check(self, url):
+        """
+        Returns: (status, detail) where status is 'ok', 'broken', 'unreachable' or 'invalid'
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+            return 'invalid', 'not an http(s) URL'
+        
+        for method in ('HEAD', 'GET'):
+            headers = {'User-Agent': 'JobOrderMigration/1.0'}
+            if method == 'GET':
+                headers['Range'] = 'bytes=0-0'
+            request = urllib.request.Request(url, method=method, headers=headers)
+            
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return 'ok', response.status
+            except urllib.error.HTTPError as e:
+                if method == 'HEAD' and e.code in self.HEAD_REFUSED:
+                    continue
+                return 'broken', e.code
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                return 'unreachable', str(getattr(e, 'reason', e))
+        
+        return 'broken', 'HEAD and GET refused'
+    
+    @property
+    def pending(self):
+        with self._lock:
+            return sum(1 for future in self._results.values() if not future.done())
+    
+    def finish(self, cancel_pending=False):
+        """
+        Wait for outstanding checks and write the broken-link report.
+        With cancel_pending, checks that have not started are recorded as 'unchecked'.
+        Returns: dict with 'urls', per-column status counts, 'broken' and the report filename
+        """
+        self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+        results = {
+            url: ('unchecked', 'run cancelled') if future.cancelled() else future.result()
+            for url, future in self._results.items()
+        }
+        
+        columns = {column: Counter() for column in self.columns}
+        broken = []
+        for column, url, email in self._references:
+            status, detail = results[url]
+            columns[column][status] += 1
+            if status not in ('ok', 'unchecked'):
+                broken.append((column, url, email, status, detail))
+        
+        summary = {'urls': len(results), 'columns': columns, 'broken': broken, 'filename': None}
+        if broken:
+            summary['filename'] = self._write_report(summary)
+        return summary
+    
+    def _write_report(self, summary):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"broken_assets_{timestamp}.txt"
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write("=" * 100 + "\n")
+            f.write("BROKEN IMAGE AND CONTRACT LINKS\n")
+            f.write(f"Generated: {datetime.now()}\n")
+            f.write(f"Distinct URLs checked: {summary['urls']}\n")
+            f.write(f"Total: {len(summary['broken'])}\n")
+            f.write("=" * 100 + "\n\n")
+            
+            f.write("STATUS BY COLUMN\n")
+            f.write("-" * 100 + "\n")
+            for column, counts in summary['columns'].items():
+                f.write(f"  {column:<28}: " + (", ".join(f"{k} {v}" for k, v in sorted(counts.items())) or "none") + "\n")
+            f.write("\n")
+            
+            for idx, (column, url, email, status, detail) in enumerate(summary['broken'], 1):
+                f.write(f"Record #{idx}\n")
+                f.write("-" * 100 + "\n")
+                f.write(f"  Email            : {email}\n")
+                f.write(f"  Column           : {column}\n")
+                f.write(f"  URL              : {url}\n")
+                f.write(f"  Status           : {status} ({detail})\n\n")
+        
+        return filename
+
+
+class DeadLetterFile:
+    """
+    JSON Lines file collecting rows that DB2 rejected during migration.
+    The file is only created once the first row is written.
+    """
+    def __init__(self, prefix="dead_letter"):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.filename = f"{prefix}_{timestamp}.jsonl"
+        self.count = 0
+        self._file = None
+    
+    def write(self, source_row, insert_data, error):
+        if self._file is None:
+            self._file = open(self.filename, 'w', encoding='utf-8')
+        
+        record = {
+            'errno': getattr(error, 'errno', None),
+            'sqlstate': getattr(error, 'sqlstate', None),
+            'error': getattr(error, 'msg', None) or str(error),
+            'email': source_row.get('Applicant Email Address'),
+            'insert_data': insert_data,
+            'source_row': source_row
+        }
+        self._file.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
     
-    def disconnect(self):
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class AdaptiveThrottle:
+    """
+    Load-aware batch controller for writes against the production DB2.
+    Batch size grows additively while batch commits stay under the target
+    latency and is halved on slow commits, lock waits or a high error rate.
+    Throughput is capped at max_rows_per_sec and the run backs off for
+    pause_seconds whenever commit latency crosses pause_latency. Per-row
+    lookups are timed separately and only reported: they cost at least one
+    network round trip each, so on a WAN link they would always look slow.
+    """
+    LOCK_ERRORS = (errorcode.ER_LOCK_WAIT_TIMEOUT, errorcode.ER_LOCK_DEADLOCK)
     
-    def get_table_columns(self, table_name):
-        if not self.connection or not self.connection.is_connected():
-            return []
+    def __init__(self, initial_batch=500, min_batch=50, max_batch=2000, step=100,
+                 target_latency=0.5, pause_latency=5.0, pause_seconds=30,
+                 max_rows_per_sec=1000, max_error_rate=0.05):
+        # A zero batch reads no rows, which the migration loop takes as the end of the source
+        if min_batch < 1 or max_batch < min_batch:
+            raise ValueError(f"Batch sizes must satisfy 1 <= minimum ({min_batch}) <= maximum ({max_batch})")
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.step = step
+        self.target_latency = target_latency
+        self.pause_latency = pause_latency
+        self.pause_seconds = pause_seconds
+        self.max_rows_per_sec = max_rows_per_sec
+        self.max_error_rate = max_error_rate
         
+        self.batch_size = max(min_batch, min(max_batch, initial_batch))
+        self.last_latency = 0.0
+        self.last_lookup_latency = 0.0
+        self.paused = False
+        self._timings = {'write': [0.0, 0], 'lookup': [0.0, 0]}
+        self._lock_waits = 0
+    
+    @contextmanager
+    def measure(self, kind='write'):
+        """Time one DB2 batch write ('write') or row lookup ('lookup')"""
+        started = time.perf_counter()
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(f"SHOW COLUMNS FROM `{table_name}`")
-            columns = [row[0] for row in cursor.fetchall()]
-            cursor.close()
-            return columns
-        except Error:
-            return []
+            yield
+        finally:
+            timing = self._timings[kind]
+            timing[0] += time.perf_counter() - started
+            timing[1] += 1
     
-    def get_row_count(self, table_name):
-        if not self.connection or not self.connection.is_connected():
-            return 0
+    def record_lock_wait(self):
+        self._lock_waits += 1
+    
+    def observe(self, rows, elapsed, errors):
+        """
+        Feed the results of a finished batch and adjust the next batch size.
+        Returns: seconds to sleep before the next batch
+        """
+        write_time, writes = self._timings['write']
+        lookup_time, lookups = self._timings['lookup']
+        self.last_latency = write_time / writes if writes else 0.0
+        self.last_lookup_latency = lookup_time / lookups if lookups else 0.0
+        error_rate = errors / max(rows, 1)
+        lock_waits = self._lock_waits
         
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
-            count = cursor.fetchone()[0]
-            cursor.close()
-            return count
-        except Error:
-            return 0
+        self._timings = {'write': [0.0, 0], 'lookup': [0.0, 0]}
+        self._lock_waits = 0
+        
+        self.paused = self.last_latency > self.pause_latency
+        if self.paused:
+            self.batch_size = max(1, self.min_batch)
+            return self.pause_seconds
+        
+        if lock_waits or error_rate > self.max_error_rate or self.last_latency > self.target_latency:
+            self.batch_size = max(1, self.min_batch, self.batch_size // 2)
+        else:
+            self.batch_size = min(self.max_batch, self.batch_size + self.step)
+        
+        if self.max_rows_per_sec and rows:
+            return max(0.0, rows / self.max_rows_per_sec - elapsed)
+        return 0.0
+
+
+class ColumnMatcher:
+    """
+    Suggests DB1 -> DB2 column pairs from a precomputed similarity matrix.
+    Each score combines overlap of normalized name tokens, Levenshtein
+    similarity and type compatibility. Bigram overlap stands in for the edit
+    distance on the first pass; only the REFINE_TOP best candidates of each
+    source column are rescored with the real Levenshtein ratio. Pairs are
+    assigned greedily from the best score down, so every column on either
+    side is used at most once.
+    
+    Every column on both sides belongs to a job order, so a table-name token
+    (joborder_status, JO Remarks) counts as present on both sides once the
+    names share another token: Status prefers joborder_status over
+    onsite_status, and JO Remarks outranks a bare Remarks.
+    """
+    TOKEN_WEIGHT = 0.55
+    EDIT_WEIGHT = 0.30
+    TYPE_WEIGHT = 0.15
+    REFINE_TOP = 8
+    CONTEXT = '\0table'
+    
+    TYPE_FAMILIES = {
+        'numeric': ('tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint', 'decimal', 'numeric',
+                    'float', 'double', 'real', 'bit', 'year'),
+        'temporal': ('date', 'datetime', 'timestamp', 'time'),
+        'binary': ('binary', 'varbinary', 'tinyblob', 'blob', 'mediumblob', 'longblob')
+    }
+    
+    def __init__(self, source_columns, target_columns, source_types=None, target_types=None, threshold=0.5,
+                 source_table="Job Order", target_table="job_orders"):
+        self.source_columns = source_columns
+        self.target_columns = target_columns
+        self.source_types = source_types or {}
+        self.target_types = target_types or {}
+        self.threshold = threshold
+        self.context = self._table_tokens(source_table) | self._table_tokens(target_table)
+        self._matrix = None
+    
+    @staticmethod
+    def tokenize(name):
+        name = re.sub(r'([a-z0-9])([A-Z])', r'\1 \2', name)
+        return [token for token in re.split(r'[^A-Za-z0-9]+', name.lower()) if token]
+    
+    @classmethod
+    def _table_tokens(cls, table):
+        """Spellings of a table name used inside column names: job_orders -> joborder, jo"""
+        tokens = [token[:-1] if token.endswith('s') else token for token in cls.tokenize(table)]
+        if not tokens:
+            return set()
+        spellings = {''.join(tokens)}
+        if len(tokens) > 1:
+            spellings.add(''.join(token[0] for token in tokens))
+        return spellings
+    
+    def _name_tokens(self, name):
+        return {self.CONTEXT if token in self.context else token for token in self.tokenize(name)}
+    
+    @staticmethod
+    def _bigrams(text):
+        return {text[i:i + 2] for i in range(len(text) - 1)} or {text}
+    
+    @staticmethod
+    def _levenshtein_ratio(a, b):
+        if a == b:
+            return 1.0
+        previous = list(range(len(b) + 1))
+        for i, char_a in enumerate(a, 1):
+            current = [i]
+            for j, char_b in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+            previous = current
+        return 1.0 - previous[-1] / max(len(a), len(b), 1)
+    
+    def _type_family(self, column_type):
+        if not column_type:
+            return None
+        base = column_type.lower().split('(')[0].split()[0]
+        for family, types in self.TYPE_FAMILIES.items():
+            if base in types:
+                return family
+        return 'text'
+    
+    def _type_score(self, source_type, target_type):
+        source_family = self._type_family(source_type)
+        target_family = self._type_family(target_type)
+        if source_family is None or target_family is None:
+            return 0.5
+        if source_family == target_family:
+            return 1.0
+        if target_family == 'text' or source_family == 'text':
+            # Legacy text columns often hold dates and amounts
+            return 0.5
+        return 0.0
+    
+    def matrix(self):
+        """Returns: rows of scores, one row per source column"""
+        if self._matrix is not None:
+            return self._matrix
+        
+        targets = []
+        for column in self.target_columns:
+            joined = ''.join(self.tokenize(column))
+            targets.append((self._name_tokens(column), joined, self._bigrams(joined), self.target_types.get(column)))
+        
+        context_only = {self.CONTEXT}
+        self._matrix = []
+        for column in self.source_columns:
+            tokens = self._name_tokens(column)
+            joined = ''.join(self.tokenize(column))
+            bigrams = self._bigrams(joined)
+            source_type = self.source_types.get(column)
+            
+            row = []
+            base_scores = []
+            for target_tokens, target_joined, target_bigrams, target_type in targets:
+                if joined == target_joined:
+                    row.append(1.0)
+                    base_scores.append(None)
+                    continue
+                
+                shared = tokens & target_tokens
+                token_score = 0.0
+                if shared and shared != context_only:
+                    source_tokens = tokens
+                    if self.CONTEXT in tokens or self.CONTEXT in target_tokens:
+                        source_tokens = tokens | {self.CONTEXT}
+                        target_tokens = target_tokens | {self.CONTEXT}
+                    common = len(source_tokens & target_tokens)
+                    containment = common / min(len(source_tokens), len(target_tokens))
+                    jaccard = common / len(source_tokens | target_tokens)
+                    token_score = (containment + jaccard) / 2
+                
+                base = self.TOKEN_WEIGHT * token_score + self.TYPE_WEIGHT * self._type_score(source_type, target_type)
+                dice = 2 * len(bigrams & target_bigrams) / (len(bigrams) + len(target_bigrams))
+                row.append(base + self.EDIT_WEIGHT * dice)
+                base_scores.append(base)
+            
+            ranked = sorted(range(len(row)), key=row.__getitem__, reverse=True)
+            for j in ranked[:self.REFINE_TOP]:
+                if base_scores[j] is not None:
+                    row[j] = base_scores[j] + self.EDIT_WEIGHT * self._levenshtein_ratio(joined, targets[j][1])
+            self._matrix.append(row)
+        return self._matrix
+    
+    def suggest(self, exclude_sources=(), exclude_targets=()):
+        """
+        Returns: dict source_column -> (target_column, score) for pairs above the threshold
+        """
+        matrix = self.matrix()
+        candidates = [
+            (score, i, j)
+            for i, row in enumerate(matrix) if self.source_columns[i] not in exclude_sources
+            for j, score in enumerate(row) if score >= self.threshold and self.target_columns[j] not in exclude_targets
+        ]
+        candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+        
+        used_sources = set()
+        used_targets = set()
+        suggestions = {}
+        for score, i, j in candidates:
+            if i in used_sources or j in used_targets:
+                continue
+            used_sources.add(i)
+            used_targets.add(j)
+            suggestions[self.source_columns[i]] = (self.target_columns[j], score)
+        return suggestions
 
 
 class ColumnMappingDialog:
-    def __init__(self, parent, db1_columns, db2_columns, default_mapping=None):
+    def __init__(self, parent, db1_columns, db2_columns, default_mapping=None, db1_types=None, db2_types=None):
         self.parent = parent
         self.db1_columns = db1_columns
         self.db2_columns = db2_columns
-        self.mapping = default_mapping or {}
+        self.mapping = dict(default_mapping or {})
+        self.matcher = ColumnMatcher(db1_columns, db2_columns, db1_types, db2_types)
+        self.scores = {}
         self.result = None
         
         self.window = tk.Toplevel(parent)
@@ -117,74 +2183,45 @@ class ColumnMappingDialog:
         
         tk.Label(
             info_frame, 
-            text="Map columns from Database 1 (Job Order) to Database 2 (job_orders table)",
+            text="Map columns from Database 1 (Job Order) to Database 2 (job_orders table). "
+                 "Double-click a row to change its destination.",
             font=("Arial", 9), bg="#f0f0f0", fg="#444444"
         ).pack()
         
         mapping_container = tk.Frame(self.window, bg="white")
         mapping_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
         
-        header_frame = tk.Frame(mapping_container, bg="white")
-        header_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        tk.Label(
-            header_frame, text="Database 1 (Source)",
-            font=("Arial", 10, "bold"), bg="white", fg="#1a1a2e", anchor=tk.W
-        ).pack(side=tk.LEFT, padx=(0, 10), fill=tk.X, expand=True)
-        
-        tk.Label(
-            header_frame, text="→",
-            font=("Arial", 12, "bold"), bg="white", fg="#666666"
-        ).pack(side=tk.LEFT, padx=10)
-        
-        tk.Label(
-            header_frame, text="Database 2 (Destination)",
-            font=("Arial", 10, "bold"), bg="white", fg="#1a1a2e", anchor=tk.W
-        ).pack(side=tk.LEFT, padx=(10, 0), fill=tk.X, expand=True)
-        
-        canvas_frame = tk.Frame(mapping_container, bg="white")
-        canvas_frame.pack(fill=tk.BOTH, expand=True)
-        
-        canvas = tk.Canvas(canvas_frame, bg="white", highlightthickness=0)
-        scrollbar = ttk.Scrollbar(canvas_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg="white")
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        # A single Treeview draws only the visible rows, and one shared Combobox
+        # is placed over the row being edited instead of one widget set per column
+        self.tree = ttk.Treeview(
+            mapping_container, columns=("source", "target", "score"),
+            show="headings", selectmode="browse"
         )
+        self.tree.heading("source", text="Database 1 (Source)", anchor=tk.W)
+        self.tree.heading("target", text="Database 2 (Destination)", anchor=tk.W)
+        self.tree.heading("score", text="Match")
+        self.tree.column("source", width=360, anchor=tk.W)
+        self.tree.column("target", width=360, anchor=tk.W)
+        self.tree.column("score", width=80, anchor=tk.CENTER, stretch=False)
         
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(mapping_container, orient="vertical", command=self._on_scroll)
+        self.tree.configure(yscrollcommand=scrollbar.set)
         
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        self.mapping_widgets = {}
+        for idx, db1_col in enumerate(self.db1_columns):
+            self.tree.insert("", tk.END, iid=str(idx), values=self._row_values(db1_col))
         
-        for db1_col in self.db1_columns:
-            row_frame = tk.Frame(scrollable_frame, bg="white", pady=5)
-            row_frame.pack(fill=tk.X, padx=10)
-            
-            tk.Label(
-                row_frame, text=db1_col,
-                font=("Arial", 9), bg="white", fg="#333333", anchor=tk.W
-            ).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
-            
-            tk.Label(
-                row_frame, text="→",
-                font=("Arial", 10), bg="white", fg="#999999"
-            ).pack(side=tk.LEFT, padx=5)
-            
-            var = tk.StringVar(value=self.mapping.get(db1_col, ""))
-            combo = ttk.Combobox(
-                row_frame, textvariable=var,
-                values=[""] + self.db2_columns,
-                state="readonly", width=30
-            )
-            combo.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(10, 0))
-            
-            self.mapping_widgets[db1_col] = var
+        self._editor = ttk.Combobox(self.tree, values=[""] + self.db2_columns, state="readonly")
+        self._editor_row = None
+        self._editor.bind("<<ComboboxSelected>>", self._commit_editor)
+        self._editor.bind("<Escape>", lambda e: self._hide_editor())
+        
+        self.tree.bind("<Double-1>", self._open_editor)
+        self.tree.bind("<Return>", self._open_editor)
+        self.tree.bind("<MouseWheel>", lambda e: self._hide_editor(), add="+")
+        self.tree.bind("<Configure>", lambda e: self._hide_editor(), add="+")
         
         bottom_frame = tk.Frame(self.window, bg="#f0f0f0", pady=15)
         bottom_frame.pack(fill=tk.X, side=tk.BOTTOM)
@@ -193,7 +2230,7 @@ class ColumnMappingDialog:
         button_container.pack()
         
         tk.Button(
-            button_container, text="Auto-Map (Same Names)",
+            button_container, text="Auto-Map (Similar Names)",
             font=("Arial", 9, "bold"),
             bg="#2196f3", fg="white",
             activebackground="#1976d2", activeforeground="white",
@@ -228,23 +2265,78 @@ class ColumnMappingDialog:
             command=self._apply
         ).pack(side=tk.LEFT, padx=5)
     
+    def _row_values(self, db1_col):
+        score = self.scores.get(db1_col)
+        return (db1_col, self.mapping.get(db1_col, ""), f"{score:.0%}" if score is not None else "")
+    
+    def _refresh_row(self, idx):
+        self.tree.item(str(idx), values=self._row_values(self.db1_columns[idx]))
+    
+    def _on_scroll(self, *args):
+        self._hide_editor()
+        self.tree.yview(*args)
+    
+    def _open_editor(self, event):
+        row = self.tree.identify_row(event.y) if event.type == tk.EventType.ButtonPress else self.tree.focus()
+        if not row:
+            return
+        
+        bbox = self.tree.bbox(row, "target")
+        if not bbox:
+            return
+        
+        x, y, width, height = bbox
+        self._editor_row = int(row)
+        self._editor.set(self.mapping.get(self.db1_columns[self._editor_row], ""))
+        self._editor.place(x=x, y=y, width=width, height=height)
+        self._editor.focus_set()
+    
+    def _commit_editor(self, event=None):
+        if self._editor_row is None:
+            return
+        
+        db1_col = self.db1_columns[self._editor_row]
+        value = self._editor.get()
+        if value:
+            self.mapping[db1_col] = value
+        else:
+            self.mapping.pop(db1_col, None)
+        self.scores.pop(db1_col, None)
+        
+        self._refresh_row(self._editor_row)
+        self._hide_editor()
+    
+    def _hide_editor(self):
+        self._editor.place_forget()
+        self._editor_row = None
+    
     def _auto_map(self):
-        db2_set = set(self.db2_columns)
-        for db1_col in self.db1_columns:
-            if db1_col in db2_set:
-                self.mapping_widgets[db1_col].set(db1_col)
-        messagebox.showinfo("Auto-Map", "Columns with matching names have been mapped")
+        self._hide_editor()
+        suggestions = self.matcher.suggest(
+            exclude_sources=set(self.mapping), exclude_targets=set(self.mapping.values())
+        )
+        
+        for db1_col, (db2_col, score) in suggestions.items():
+            self.mapping[db1_col] = db2_col
+            self.scores[db1_col] = score
+        
+        for idx in range(len(self.db1_columns)):
+            self._refresh_row(idx)
+        
+        messagebox.showinfo("Auto-Map", f"{len(suggestions)} unmapped columns were mapped by name similarity")
     
     def _clear_all(self):
-        for var in self.mapping_widgets.values():
-            var.set("")
+        self._hide_editor()
+        self.mapping = {}
+        self.scores = {}
+        for idx in range(len(self.db1_columns)):
+            self._refresh_row(idx)
     
     def _apply(self):
-        self.result = {}
-        for db1_col, var in self.mapping_widgets.items():
-            db2_col = var.get()
-            if db2_col:
-                self.result[db1_col] = db2_col
+        self.result = {
+            db1_col: self.mapping[db1_col]
+            for db1_col in self.db1_columns if self.mapping.get(db1_col)
+        }
         
         if not self.result:
             messagebox.showwarning("Warning", "No columns have been mapped")
@@ -253,9 +2345,102 @@ class ColumnMappingDialog:
         self.window.destroy()
 
 
+class ThrottleSettingsDialog:
+    """Edits the AdaptiveThrottle targets used by the next migration run"""
+    FIELDS = (
+        ('initial_batch', "Initial batch size (rows)", int, 1),
+        ('min_batch', "Minimum batch size (rows)", int, 1),
+        ('max_batch', "Maximum batch size (rows)", int, 1),
+        ('target_latency', "Target commit latency (ms)", float, 1000),
+        ('pause_latency', "Pause when commit latency exceeds (ms)", float, 1000),
+        ('pause_seconds', "Pause length (seconds)", float, 1),
+        ('max_rows_per_sec', "Max rows/sec (0 = unlimited)", int, 1)
+    )
+    
+    def __init__(self, parent, settings):
+        self.settings = settings
+        self.result = None
+        self.entries = {}
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Throttle Settings")
+        self.window.transient(parent)
+        self.window.grab_set()
+        self.window.resizable(False, False)
+        self.window.configure(bg="white")
+        
+        header = tk.Frame(self.window, bg="#1a1a2e", height=50)
+        header.pack(fill=tk.X)
+        header.pack_propagate(False)
+        tk.Label(
+            header, text="⚙ Throttle Settings",
+            font=("Arial", 12, "bold"), bg="#1a1a2e", fg="white"
+        ).pack(side=tk.LEFT, padx=20, pady=10)
+        
+        form = tk.Frame(self.window, bg="white", padx=20, pady=15)
+        form.pack(fill=tk.BOTH)
+        for row, (key, label, cast, scale) in enumerate(self.FIELDS):
+            tk.Label(form, text=label, font=("Arial", 9), bg="white", fg="#444444").grid(
+                row=row, column=0, sticky=tk.W, pady=3
+            )
+            entry = tk.Entry(form, font=("Arial", 9), width=12)
+            value = settings[key] * scale
+            entry.insert(0, str(int(value) if float(value).is_integer() else value))
+            entry.grid(row=row, column=1, sticky=tk.E, padx=(15, 0), pady=3)
+            self.entries[key] = entry
+        
+        buttons = tk.Frame(self.window, bg="#f0f0f0", pady=10)
+        buttons.pack(fill=tk.X)
+        tk.Button(
+            buttons, text="Save",
+            font=("Arial", 10, "bold"),
+            bg="#4caf50", fg="white",
+            activebackground="#388e3c", activeforeground="white",
+            relief=tk.FLAT, padx=20, pady=5, cursor="hand2",
+            command=self._apply
+        ).pack(side=tk.RIGHT, padx=(5, 20))
+        tk.Button(
+            buttons, text="Cancel",
+            font=("Arial", 10),
+            bg="#607d8b", fg="white",
+            activebackground="#455a64", activeforeground="white",
+            relief=tk.FLAT, padx=20, pady=5, cursor="hand2",
+            command=self.window.destroy
+        ).pack(side=tk.RIGHT, padx=5)
+    
+    def _apply(self):
+        result = dict(self.settings)
+        for key, label, cast, scale in self.FIELDS:
+            try:
+                value = cast(self.entries[key].get().strip())
+            except ValueError:
+                messagebox.showwarning("Warning", f"{label} must be a number", parent=self.window)
+                return
+            if value < 0:
+                messagebox.showwarning("Warning", f"{label} cannot be negative", parent=self.window)
+                return
+            result[key] = value / scale if scale != 1 else value
+        
+        if result['min_batch'] < 1:
+            messagebox.showwarning("Warning", "Minimum batch size must be at least 1", parent=self.window)
+            return
+        
+        if not result['min_batch'] <= result['initial_batch'] <= result['max_batch']:
+            messagebox.showwarning("Warning", "Batch sizes must satisfy minimum <= initial <= maximum",
+                                   parent=self.window)
+            return
+        
+        self.result = result
+        self.window.destroy()
+
+
 class TransferModal:
-    def __init__(self, parent):
+    def __init__(self, parent, title="Migrating Job Orders...",
+                 subtitle="Matching job orders by Applicant Email Address", control=None):
         self.parent = parent
+        self.title = title
+        self.subtitle = subtitle
+        self.control = control
         self.state = "LOADING"
         self.message_queue = queue.Queue()
         
@@ -265,7 +2450,7 @@ class TransferModal:
         self.window.transient(parent)
         self.window.grab_set()
         self.window.resizable(False, False)
-        self.window.protocol("WM_DELETE_WINDOW", lambda: None)
+        self.window.protocol("WM_DELETE_WINDOW", self._on_close_request)
         
         parent.update_idletasks()
         x = parent.winfo_rootx() + (parent.winfo_width() - 700) // 2
@@ -290,13 +2475,13 @@ class TransferModal:
         text_frame.pack(side=tk.LEFT, pady=8)
         
         self._title_label = tk.Label(
-            text_frame, text="Migrating Job Orders...",
+            text_frame, text=self.title,
             font=("Arial", 14, "bold"), bg="#1a1a2e", fg="white"
         )
         self._title_label.pack(anchor=tk.W)
         
         self._subtitle_label = tk.Label(
-            text_frame, text="Matching job orders by Applicant Email Address",
+            text_frame, text=self.subtitle,
             font=("Arial", 9), bg="#1a1a2e", fg="#aaaaaa"
         )
         self._subtitle_label.pack(anchor=tk.W, pady=(2, 0))
@@ -340,6 +2525,62 @@ class TransferModal:
         
         self._bottom_frame = tk.Frame(self.window, bg="#f0f0f0", pady=12)
         self._bottom_frame.pack(fill=tk.X, side=tk.BOTTOM)
+        
+        if self.control is not None:
+            self._cancel_button = tk.Button(
+                self._bottom_frame, text="Cancel",
+                font=("Arial", 10, "bold"),
+                bg="#e53935", fg="white",
+                activebackground="#c62828", activeforeground="white",
+                relief=tk.FLAT, bd=0,
+                padx=24, pady=6, cursor="hand2",
+                command=self._request_cancel
+            )
+            self._cancel_button.pack(side=tk.RIGHT, padx=(5, 25))
+            
+            self._pause_button = tk.Button(
+                self._bottom_frame, text="Pause",
+                font=("Arial", 10, "bold"),
+                bg="#ff9800", fg="white",
+                activebackground="#f57c00", activeforeground="white",
+                relief=tk.FLAT, bd=0,
+                padx=24, pady=6, cursor="hand2",
+                command=self._toggle_pause
+            )
+            self._pause_button.pack(side=tk.RIGHT, padx=5)
+    
+    def _toggle_pause(self):
+        if self.control.paused:
+            self.control.resume()
+            self._pause_button.config(text="Pause")
+            self._progress.start(15)
+            self._update_header("⏳", self.title, self.subtitle, "#1a1a2e")
+        else:
+            self.control.pause()
+            self._pause_button.config(text="Resume")
+            self._progress.stop()
+            self._update_header("⏸", "Pausing...", "Stopping after the current batch commits", "#37474f")
+    
+    def _request_cancel(self):
+        if self.control.cancelled:
+            return
+        
+        if messagebox.askyesno(
+            "Cancel Migration",
+            "Stop the migration after the current batch commits?\n\n"
+            "Finished batches stay in DB2 and the run can be resumed later.",
+            parent=self.window
+        ):
+            self.control.cancel()
+            self._pause_button.config(state=tk.DISABLED)
+            self._cancel_button.config(state=tk.DISABLED, text="Cancelling...")
+            self._update_header("⏹", "Cancelling...", "Stopping after the current batch commits", "#37474f")
+    
+    def _on_close_request(self):
+        if self.state != "LOADING":
+            self.window.destroy()
+        elif self.control is not None:
+            self._request_cancel()
     
     def enqueue(self, message, level="INFO"):
         self.message_queue.put((message, level))
@@ -364,6 +2605,18 @@ class TransferModal:
             elif message == "__FAILED__":
                 self._transition_failed(payload)
                 return
+            elif message == "__VERIFIED__":
+                self._transition_verified(payload)
+                return
+            elif message == "__CANCELLED__":
+                self._transition_cancelled(payload)
+                return
+            elif message == "__PREFLIGHT__":
+                self._transition_preflight(payload)
+                return
+            elif message == "__RESOLVED__":
+                self._transition_resolved(payload)
+                return
             else:
                 self._append_log(message, payload)
         
@@ -394,12 +2647,126 @@ class TransferModal:
         self._append_log(f"  Unique Matches       : {stats['matched']:,}", "SUCCESS")
         self._append_log(f"  Job Orders Created   : {stats['created']:,}", "SUCCESS")
         self._append_log(f"  Multiple Matches     : {stats['multiple']:,}", "WARNING")
-        self._append_log(f"  No Match (Skipped)   : {stats['skipped']:,}", "WARNING")
+        self._append_log(f"  No Email (Skipped)   : {stats['skipped']:,}", "WARNING")
+        self._append_log(f"  Already Exists       : {stats['exists']:,}", "WARNING")
+        self._append_log(f"  Failed (Dead-Letter) : {stats['failed']:,}", "ERROR" if stats['failed'] else "SUCCESS")
+        if 'grouped' in stats:
+            self._append_log(f"  Grouped Duplicates   : {stats['grouped']:,}", "WARNING" if stats['grouped'] else "SUCCESS")
+        if 'assets' in stats:
+            broken = len(stats['assets']['broken'])
+            self._append_log(f"  Broken Asset Links   : {broken:,}", "WARNING" if broken else "SUCCESS")
+        if 'reconciliation' in stats:
+            self._append_reconciliation(stats['reconciliation'])
+        self._append_log("=" * 50, "SEP")
+        
+        self._set_action_button("Close", "#4caf50", self.window.destroy)
+    
+    def _transition_cancelled(self, stats):
+        self.state = "CANCELLED"
+        self._progress.stop()
+        
+        self._update_header(
+            icon="⏹",
+            title="Migration Cancelled",
+            subtitle=f"Stopped after {stats['unit']} {stats['position']:,}; finished batches were committed",
+            bg_color="#37474f"
+        )
+        
+        self._append_log("", "INFO")
+        self._append_log("=" * 50, "SEP")
+        label = "Stopped At Group" if stats['unit'] == "group" else "Stopped At Row"
+        self._append_log(f"  {label:<21}: {stats['position']:,}", "WARNING")
+        self._append_log(f"  Total Processed      : {stats['total']:,}", "SUCCESS")
+        self._append_log(f"  Job Orders Created   : {stats['created']:,}", "SUCCESS")
+        self._append_log(f"  Multiple Matches     : {stats['multiple']:,}", "WARNING")
+        self._append_log(f"  No Email (Skipped)   : {stats['skipped']:,}", "WARNING")
         self._append_log(f"  Already Exists       : {stats['exists']:,}", "WARNING")
+        self._append_log(f"  Failed (Dead-Letter) : {stats['failed']:,}", "ERROR" if stats['failed'] else "SUCCESS")
+        self._append_log("=" * 50, "SEP")
+        
+        self._set_action_button("Close", "#607d8b", self.window.destroy)
+    
+    def _transition_preflight(self, result):
+        self.state = "SUCCESS"
+        self._progress.stop()
+        self._progress.config(mode="determinate", value=100)
+        
+        counts = Counter(item['severity'] for item in result['findings'])
+        self._update_header(
+            icon="⚠️" if counts['HIGH'] else "✅",
+            title="Preflight Complete",
+            subtitle=f"Estimated runtime {format_duration(result['estimate'])}",
+            bg_color="#e65100" if counts['HIGH'] else "#1b5e20"
+        )
+        
+        timings = result['timings']
+        self._append_log("", "INFO")
+        self._append_log("=" * 50, "SEP")
+        self._append_log(f"  High                 : {counts['HIGH']:,}", "ERROR" if counts['HIGH'] else "SUCCESS")
+        self._append_log(f"  Medium               : {counts['MEDIUM']:,}", "WARNING" if counts['MEDIUM'] else "SUCCESS")
+        self._append_log(f"  Info                 : {counts['INFO']:,}", "INFO")
+        self._append_log(f"  Round Trip           : {timings['rtt'] * 1000:.1f} ms", "INFO")
+        self._append_log(f"  Lookup (median)      : {timings.get('lookup', 0) * 1000:.1f} ms", "INFO")
+        self._append_log(f"  Estimated Runtime    : {format_duration(result['estimate'])}", "SUCCESS")
+        self._append_log(f"  Report               : {result['filename']}", "INFO")
+        self._append_log("=" * 50, "SEP")
+        
+        self._set_action_button("Close", "#4caf50", self.window.destroy)
+    
+    def _transition_resolved(self, result):
+        self.state = "SUCCESS"
+        self._progress.stop()
+        self._progress.config(mode="determinate", value=100)
+        
+        self._update_header(
+            icon="✅",
+            title="Resolution Applied",
+            subtitle=f"{result['job_orders']:,} job orders filled in {result['batches']:,} batches",
+            bg_color="#1b5e20"
+        )
+        
+        self._append_log("", "INFO")
+        self._append_log("=" * 50, "SEP")
+        self._append_log(f"  Job Orders Filled    : {result['job_orders']:,}", "SUCCESS")
+        self._append_log(f"  Columns Filled       : {result['columns']:,}", "SUCCESS")
+        if result['failed']:
+            self._append_log(f"  Rejected by DB2      : {len(result['failed']):,}", "WARNING")
+            for item in result['failed']:
+                self._append_log(f"    #{item['id']}: {item['error']}", "WARNING")
+        self._append_log(f"  Undo Log             : {result['undo'] or 'none'}", "INFO")
+        self._append_log("=" * 50, "SEP")
+        
+        self._set_action_button("Close", "#4caf50", self.window.destroy)
+    
+    def _transition_verified(self, result):
+        self.state = "SUCCESS"
+        self._progress.stop()
+        self._progress.config(mode="determinate", value=100)
+        
+        clean = not (result['mismatched_buckets'] or result['only_source'] or result['only_target'])
+        self._update_header(
+            icon="✅" if clean else "⚠️",
+            title="Verification Complete",
+            subtitle="DB1 and DB2 match" if clean else f"{result['mismatched_buckets']} buckets differ",
+            bg_color="#1b5e20" if clean else "#e65100"
+        )
+        
+        self._append_log("", "INFO")
+        self._append_log("=" * 50, "SEP")
+        self._append_reconciliation(result)
         self._append_log("=" * 50, "SEP")
         
         self._set_action_button("Close", "#4caf50", self.window.destroy)
     
+    def _append_reconciliation(self, result):
+        level = "WARNING" if result['mismatched_buckets'] else "SUCCESS"
+        self._append_log(f"  Buckets Compared     : {result['buckets']:,}", "SUCCESS")
+        self._append_log(f"  Buckets Mismatched   : {result['mismatched_buckets']:,}", level)
+        self._append_log(f"  Only in DB1          : {len(result['only_source']):,}", level)
+        self._append_log(f"  Only in DB2          : {len(result['only_target']):,}", level)
+        self._append_log(f"  Differing Data       : {len(result['diffs']):,}", level)
+        self._append_log(f"  Report               : {result['filename']}", "INFO")
+    
     def _transition_failed(self, error_message):
         self.state = "FAILED"
         self._progress.stop()
@@ -437,18 +2804,51 @@ class TransferModal:
 class MigrationApp:
     def __init__(self, root):
         self.root = root
-        self.root.title("Job Order Migration Tool")
-        self.root.geometry("1000x700")
+        if root is not None:
+            self.root.title("Job Order Migration Tool")
+            self.root.geometry("1000x700")
         
         self.db1 = DatabaseConnection("localhost", 3306, "root", "", "atsscbms_db1")
         self.db2 = DatabaseConnection("15.235.167.58", 3306, "atsscbms_AmpereSync", "N3wP@ssword00", "atsscbms_sync")
         
         self.column_mapping = {}
+        self.throttle_settings = {
+            'initial_batch': 500,
+            'min_batch': 50,
+            'max_batch': 2000,
+            'target_latency': 0.5,
+            'pause_latency': 5.0,
+            'pause_seconds': 30,
+            'max_rows_per_sec': 1000
+        }
+        self.throttle = AdaptiveThrottle(**self.throttle_settings)
+        self.snapshot = SourceSnapshot(self.db1, "Job Order")
+        self.use_snapshot = False
+        self.snapshot_refreshing = False
+        self.migration_running = False
+        self.verify_after_migration = False
+        self.profile_run = False
+        self.profiler = None
+        self.validate_assets = False
+        self.asset_settings = {'max_workers': 16, 'timeout': 10}
+        self.write_strategy = 'multirow'
+        self.resolution_rules = MultipleMatchResolver.RULES
+        self.group_by_email = False
+        self.group_policy = 'newest_timestamp'
+        self.resume_grouped = False
+        self.control = MigrationControl()
+        self.start_offset = 0
+        self.resume_offset = 0
+        self._source_key = None
+        self.migrated_rows = []
+        self._last_target_id = 0
         self.multiple_matches = []
         self.no_matches = []
         self.already_exists = []
+        self.grouped_duplicates = []
         
-        self._build_ui()
+        if root is not None:
+            self._build_ui()
         self._apply_default_mapping()
     
     def _apply_default_mapping(self):
@@ -519,14 +2919,15 @@ class MigrationApp:
         self.db2_status = tk.Label(conn_row, text="● DB2: Not Connected", font=("Arial", 9), bg="white", fg="#ef5350")
         self.db2_status.pack(side=tk.LEFT, padx=10)
         
-        tk.Button(
+        self.connect_btn = tk.Button(
             conn_row, text="Connect",
             font=("Arial", 9, "bold"),
             bg="#2196f3", fg="white",
             activebackground="#1976d2", activeforeground="white",
             relief=tk.FLAT, padx=20, pady=6, cursor="hand2",
             command=self._connect_databases
-        ).pack(side=tk.RIGHT, padx=10)
+        )
+        self.connect_btn.pack(side=tk.RIGHT, padx=10)
         
         config_panel = tk.LabelFrame(main, text="  Configuration  ", font=("Arial", 10, "bold"), bg="white", pady=15)
         config_panel.pack(fill=tk.X, padx=20, pady=10)
@@ -540,22 +2941,91 @@ class MigrationApp:
             font=("Arial", 9, "bold"), bg="white", fg="#1976d2"
         ).pack(side=tk.LEFT, padx=(0, 10))
         
-        map_frame = tk.Frame(config_panel, bg="white")
-        map_frame.pack(fill=tk.X, padx=15, pady=(10, 5))
+        map_frame = tk.Frame(config_panel, bg="white")
+        map_frame.pack(fill=tk.X, padx=15, pady=(10, 5))
+        
+        self.mapping_label = tk.Label(
+            map_frame, text=f"Column Mapping: {len(self.column_mapping)} columns mapped",
+            font=("Arial", 9), bg="white", fg="#666666"
+        )
+        self.mapping_label.pack(side=tk.LEFT)
+        
+        tk.Button(
+            map_frame, text="Configure Mapping",
+            font=("Arial", 9, "bold"),
+            bg="#9c27b0", fg="white",
+            activebackground="#7b1fa2", activeforeground="white",
+            relief=tk.FLAT, padx=15, pady=5, cursor="hand2",
+            command=self._configure_mapping
+        ).pack(side=tk.RIGHT)
+        
+        snapshot_frame = tk.Frame(config_panel, bg="white")
+        snapshot_frame.pack(fill=tk.X, padx=15, pady=(10, 5))
+        
+        self.snapshot_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            snapshot_frame, text="Read source from local snapshot (no load on DB1)",
+            variable=self.snapshot_var,
+            font=("Arial", 9), bg="white", fg="#666666", activebackground="white"
+        ).pack(side=tk.LEFT)
+        
+        self.refresh_snapshot_btn = tk.Button(
+            snapshot_frame, text="Refresh Snapshot",
+            font=("Arial", 9),
+            bg="#607d8b", fg="white",
+            activebackground="#455a64", activeforeground="white",
+            relief=tk.FLAT, padx=15, pady=5, cursor="hand2",
+            command=self._refresh_snapshot
+        )
+        self.refresh_snapshot_btn.pack(side=tk.RIGHT)
+        
+        verify_frame = tk.Frame(config_panel, bg="white")
+        verify_frame.pack(fill=tk.X, padx=15, pady=(5, 5))
+        
+        self.verify_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            verify_frame, text="Verify with chunk checksums after migration",
+            variable=self.verify_var,
+            font=("Arial", 9), bg="white", fg="#666666", activebackground="white"
+        ).pack(side=tk.LEFT)
         
-        self.mapping_label = tk.Label(
-            map_frame, text=f"Column Mapping: {len(self.column_mapping)} columns mapped",
-            font=("Arial", 9), bg="white", fg="#666666"
-        )
-        self.mapping_label.pack(side=tk.LEFT)
+        self.profile_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            verify_frame, text="Profile this run (cProfile + tracemalloc)",
+            variable=self.profile_var,
+            font=("Arial", 9), bg="white", fg="#666666", activebackground="white"
+        ).pack(side=tk.LEFT, padx=(20, 0))
+        
+        self.assets_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            verify_frame, text="Validate image and contract links",
+            variable=self.assets_var,
+            font=("Arial", 9), bg="white", fg="#666666", activebackground="white"
+        ).pack(side=tk.LEFT, padx=(20, 0))
+        
+        group_frame = tk.Frame(config_panel, bg="white")
+        group_frame.pack(fill=tk.X, padx=15, pady=(5, 5))
+        
+        self.group_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            group_frame, text="Group source rows by email (one lookup per email), winner:",
+            variable=self.group_var,
+            font=("Arial", 9), bg="white", fg="#666666", activebackground="white"
+        ).pack(side=tk.LEFT)
+        
+        self.group_policy_var = tk.StringVar(value=self.group_policy)
+        ttk.Combobox(
+            group_frame, textvariable=self.group_policy_var,
+            values=EmailGrouper.POLICIES, state="readonly", width=18
+        ).pack(side=tk.LEFT, padx=(5, 0))
         
         tk.Button(
-            map_frame, text="Configure Mapping",
-            font=("Arial", 9, "bold"),
-            bg="#9c27b0", fg="white",
-            activebackground="#7b1fa2", activeforeground="white",
+            group_frame, text="Throttle Settings",
+            font=("Arial", 9),
+            bg="#607d8b", fg="white",
+            activebackground="#455a64", activeforeground="white",
             relief=tk.FLAT, padx=15, pady=5, cursor="hand2",
-            command=self._configure_mapping
+            command=self._configure_throttle
         ).pack(side=tk.RIGHT)
         
         stats_panel = tk.LabelFrame(main, text="  Statistics  ", font=("Arial", 10, "bold"), bg="white", pady=15)
@@ -570,6 +3040,15 @@ class MigrationApp:
         self.db2_jos = tk.Label(stats_row, text="DB2 Job Orders: 0", font=("Arial", 9), bg="white")
         self.db2_jos.pack(side=tk.LEFT, padx=10)
         
+        tk.Button(
+            stats_row, text="Exact Count",
+            font=("Arial", 9),
+            bg="#607d8b", fg="white",
+            activebackground="#455a64", activeforeground="white",
+            relief=tk.FLAT, padx=15, pady=5, cursor="hand2",
+            command=lambda: self._load_statistics(exact=True)
+        ).pack(side=tk.RIGHT, padx=(0, 10))
+        
         tk.Button(
             stats_row, text="Refresh",
             font=("Arial", 9),
@@ -586,7 +3065,7 @@ class MigrationApp:
         button_container.pack()
         
         self.migrate_button = tk.Button(
-            button_container, text="Start Migration (Batch: 500)",
+            button_container, text="Start Migration (Adaptive Batch)",
             font=("Arial", 11, "bold"),
             bg="#4caf50", fg="white",
             activebackground="#388e3c", activeforeground="white",
@@ -607,6 +3086,17 @@ class MigrationApp:
         )
         self.export_multiples_btn.pack(side=tk.LEFT, padx=5)
         
+        self.resolve_multiples_btn = tk.Button(
+            button_container, text="Resolve Multiples",
+            font=("Arial", 10),
+            bg="#ef6c00", fg="white",
+            activebackground="#e65100", activeforeground="white",
+            relief=tk.FLAT, padx=20, pady=10, cursor="hand2",
+            command=self._start_resolution,
+            state=tk.DISABLED
+        )
+        self.resolve_multiples_btn.pack(side=tk.LEFT, padx=5)
+        
         self.export_nomatch_btn = tk.Button(
             button_container, text="Export No Match",
             font=("Arial", 10),
@@ -628,20 +3118,80 @@ class MigrationApp:
             state=tk.DISABLED
         )
         self.export_exists_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.export_grouped_btn = tk.Button(
+            button_container, text="Export Grouped Duplicates",
+            font=("Arial", 10),
+            bg="#6d4c41", fg="white",
+            activebackground="#4e342e", activeforeground="white",
+            relief=tk.FLAT, padx=20, pady=10, cursor="hand2",
+            command=self._export_grouped,
+            state=tk.DISABLED
+        )
+        self.export_grouped_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.verify_btn = tk.Button(
+            button_container, text="Verify Migration",
+            font=("Arial", 10),
+            bg="#00897b", fg="white",
+            activebackground="#00695c", activeforeground="white",
+            relief=tk.FLAT, padx=20, pady=10, cursor="hand2",
+            command=self._start_verification,
+            state=tk.DISABLED
+        )
+        self.verify_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.preflight_btn = tk.Button(
+            button_container, text="Preflight Check",
+            font=("Arial", 10),
+            bg="#5c6bc0", fg="white",
+            activebackground="#3949ab", activeforeground="white",
+            relief=tk.FLAT, padx=20, pady=10, cursor="hand2",
+            command=self._start_preflight,
+            state=tk.DISABLED
+        )
+        self.preflight_btn.pack(side=tk.LEFT, padx=5)
     
     def _connect_databases(self):
         print("\n" + "=" * 80)
         print("Connecting to databases...")
         print("=" * 80)
         
-        success1, msg1 = self.db1.connect()
+        self.connect_btn.config(state=tk.DISABLED)
+        self.db1_status.config(text="● DB1: Connecting...", fg="#ffa726")
+        self.db2_status.config(text="● DB2: Connecting...", fg="#ffa726")
+        
+        # Both connects run at the same time off the Tk thread; the slow
+        # remote DB2 handshake no longer freezes the window
+        results = {}
+        
+        def connect(name, db):
+            results[name] = db.connect()
+        
+        def worker():
+            threads = [
+                threading.Thread(target=connect, args=("db1", self.db1), daemon=True),
+                threading.Thread(target=connect, args=("db2", self.db2), daemon=True)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.root.after(0, lambda: self._on_connected(results["db1"], results["db2"]))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _on_connected(self, result1, result2):
+        success1, msg1 = result1
+        success2, msg2 = result2
+        self.connect_btn.config(state=tk.NORMAL)
+        
         if success1:
             self.db1_status.config(text="● DB1: Connected", fg="#66bb6a")
         else:
             self.db1_status.config(text="● DB1: Failed", fg="#ef5350")
             messagebox.showerror("DB1 Error", msg1)
         
-        success2, msg2 = self.db2.connect()
         if success2:
             self.db2_status.config(text="● DB2: Connected", fg="#66bb6a")
         else:
@@ -651,30 +3201,59 @@ class MigrationApp:
         if success1 and success2:
             self._load_statistics()
             self.migrate_button.config(state=tk.NORMAL)
+            self.verify_btn.config(state=tk.NORMAL)
+            self.preflight_btn.config(state=tk.NORMAL)
     
-    def _load_statistics(self):
+    def _load_statistics(self, exact=False):
         if not self.db1.connection or not self.db2.connection:
             return
         
-        db1_count = self.db1.get_row_count("Job Order")
-        db2_jos_count = self.db2.get_row_count("job_orders")
+        self._count_in_background(self.db1, "Job Order", self.db1_count, "DB1 Job Orders", exact)
+        self._count_in_background(self.db2, "job_orders", self.db2_jos, "DB2 Job Orders", exact)
+    
+    def _count_in_background(self, db, table_name, label, caption, exact):
+        # Metadata estimates are instant; exact COUNT(*) scans the whole table
+        if exact:
+            label.config(text=f"{caption}: counting...")
+        
+        def worker():
+            # Counts run on their own connection; the shared one may be in use
+            # by a migration, preflight or the mapping dialog at the same time
+            counter = db.clone()
+            try:
+                success, msg = counter.connect(verbose=False)
+                if not success:
+                    text = f"{caption}: unavailable"
+                elif exact:
+                    text = f"{caption}: {counter.get_row_count(table_name):,}"
+                else:
+                    text = f"{caption}: ~{counter.get_approx_row_count(table_name):,}"
+            finally:
+                counter.disconnect()
+            self.root.after(0, lambda: label.config(text=text))
         
-        self.db1_count.config(text=f"DB1 Job Orders: {db1_count:,}")
-        self.db2_jos.config(text=f"DB2 Job Orders: {db2_jos_count:,}")
+        threading.Thread(target=worker, daemon=True).start()
     
     def _configure_mapping(self):
         if not self.db1.connection or not self.db2.connection:
             messagebox.showwarning("Warning", "Connect to databases first")
             return
         
-        db1_columns = self.db1.get_table_columns("Job Order")
-        db2_columns = self.db2.get_table_columns("job_orders")
+        db1_schema = self.db1.get_table_schema("Job Order")
+        db2_schema = self.db2.get_table_schema("job_orders")
         
-        if not db1_columns or not db2_columns:
+        if not db1_schema or not db2_schema:
             messagebox.showerror("Error", "Failed to load table columns")
             return
         
-        dialog = ColumnMappingDialog(self.root, db1_columns, db2_columns, self.column_mapping)
+        dialog = ColumnMappingDialog(
+            self.root,
+            [name for name, _ in db1_schema],
+            [name for name, _ in db2_schema],
+            self.column_mapping,
+            db1_types=dict(db1_schema),
+            db2_types=dict(db2_schema)
+        )
         self.root.wait_window(dialog.window)
         
         if dialog.result:
@@ -682,66 +3261,381 @@ class MigrationApp:
             self.mapping_label.config(text=f"Column Mapping: {len(self.column_mapping)} columns mapped")
             messagebox.showinfo("Success", f"Mapping updated: {len(self.column_mapping)} columns")
     
+    def _configure_throttle(self):
+        dialog = ThrottleSettingsDialog(self.root, self.throttle_settings)
+        self.root.wait_window(dialog.window)
+        
+        if dialog.result:
+            self.throttle_settings = dialog.result
+    
+    def _refresh_snapshot(self):
+        if not self.db1.connection:
+            messagebox.showwarning("Warning", "Connect to databases first")
+            return
+        
+        if not self.snapshot.available:
+            messagebox.showerror("Error", "Snapshots require pyarrow (pip install pyarrow)")
+            return
+        
+        if self.migration_running:
+            messagebox.showwarning("Warning", "Wait for the running migration to finish")
+            return
+        
+        # The refresh scans DB1 on its own connection and writes through its own
+        # SourceSnapshot, so a migration or dialog on self.db1 is never interleaved
+        self.snapshot_refreshing = True
+        self.refresh_snapshot_btn.config(state=tk.DISABLED, text="Refreshing...")
+        
+        def done(show, title, message):
+            self.snapshot_refreshing = False
+            self.snapshot.close()
+            self.refresh_snapshot_btn.config(state=tk.NORMAL, text="Refresh Snapshot")
+            show(title, message)
+        
+        def worker():
+            db = self.db1.clone()
+            try:
+                success, msg = db.connect(verbose=False)
+                if not success:
+                    raise RuntimeError(msg)
+                snapshot = SourceSnapshot(db, self.snapshot.table_name)
+                result = snapshot.refresh()
+                message = (
+                    f"Snapshot saved to {snapshot.path}\n\n"
+                    f"Rows: {result['rows']:,}\n"
+                    f"Ranges re-read from DB1: {result['reread']}/{result['chunks']}"
+                )
+                self.root.after(0, lambda: done(messagebox.showinfo, "Snapshot", message))
+            except Exception as e:
+                error_message = str(e)
+                self.root.after(0, lambda: done(messagebox.showerror, "Snapshot Error", error_message))
+            finally:
+                db.disconnect()
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _prepare_snapshot(self, modal):
+        if self.snapshot.is_stale():
+            modal.enqueue("Source changed since last snapshot, refreshing...", "INFO")
+            result = self.snapshot.refresh()
+            modal.enqueue(
+                f"Snapshot refreshed: {result['rows']:,} rows, "
+                f"{result['reread']}/{result['chunks']} ranges re-read from DB1",
+                "SUCCESS"
+            )
+        else:
+            modal.enqueue(f"Reading source from snapshot {self.snapshot.path}", "INFO")
+    
+    def _phase(self, name):
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+    
+    def _fetch_source_rows(self, cursor, offset, limit):
+        if self.use_snapshot:
+            return self.snapshot.fetch(offset, limit)
+        
+        # A stable order keeps row offsets valid when a cancelled run is resumed
+        order = f" ORDER BY `{self._source_key}`" if self._source_key else ""
+        cursor.execute(f"SELECT * FROM `Job Order`{order} LIMIT {limit} OFFSET {offset}")
+        return cursor.fetchall()
+    
     def _start_migration(self):
         if not self.column_mapping:
             messagebox.showwarning("Warning", "Configure column mapping first")
             return
         
+        self.use_snapshot = self.snapshot_var.get()
+        self.verify_after_migration = self.verify_var.get()
+        self.profile_run = self.profile_var.get()
+        self.validate_assets = self.assets_var.get()
+        self.group_by_email = self.group_var.get()
+        self.group_policy = self.group_policy_var.get()
+        if self.use_snapshot and not self.snapshot.available:
+            messagebox.showerror("Error", "Snapshots require pyarrow (pip install pyarrow)")
+            return
+        if self.use_snapshot and self.snapshot_refreshing:
+            messagebox.showwarning("Warning", "Wait for the snapshot refresh to finish")
+            return
+        
         response = messagebox.askyesno(
             "Confirm Migration",
             f"Start migration?\n\n"
             f"Match strategy: Applicant Email Address (Job Order ↔ job_orders)\n"
             f"Mapped columns: {len(self.column_mapping)}\n"
-            f"Batch size: 500"
+            f"Source: {'local snapshot' if self.use_snapshot else 'DB1 (live)'}\n"
+            f"Grouping: {self.group_policy + ' per email' if self.group_by_email else 'off'}\n"
+            f"Batch size: adaptive {self.throttle_settings['min_batch']}-{self.throttle_settings['max_batch']} "
+            f"(start {self.throttle_settings['initial_batch']})\n"
+            f"Target commit latency: {self.throttle_settings['target_latency'] * 1000:.0f} ms\n"
+            f"Max rate: {self.throttle_settings['max_rows_per_sec']:,} rows/sec"
         )
         
         if not response:
             return
         
-        modal = TransferModal(self.root)
+        self.start_offset = 0
+        # Group positions and row positions are not interchangeable
+        if self.resume_offset and self.resume_grouped == self.group_by_email:
+            unit = "group" if self.resume_grouped else "source row"
+            resume = messagebox.askyesnocancel(
+                "Resume Migration",
+                f"The last run stopped after {unit} {self.resume_offset:,}.\n\n"
+                f"Yes: continue from {unit} {self.resume_offset:,}\n"
+                f"No: start over from the beginning"
+            )
+            if resume is None:
+                return
+            if resume:
+                self.start_offset = self.resume_offset
+        
+        self.control = MigrationControl()
+        modal = TransferModal(self.root, control=self.control)
         
         thread = threading.Thread(target=self._perform_migration, args=(modal,))
         thread.daemon = True
         thread.start()
     
+    def _start_verification(self):
+        if not self.column_mapping:
+            messagebox.showwarning("Warning", "Configure column mapping first")
+            return
+        if not self.migrated_rows:
+            messagebox.showwarning("Warning", "No job orders were created in this session; nothing to verify")
+            return
+        
+        modal = TransferModal(
+            self.root, title="Verifying Migration...",
+            subtitle="Comparing chunk checksums between DB1 and DB2"
+        )
+        
+        thread = threading.Thread(target=self._perform_verification, args=(modal,))
+        thread.daemon = True
+        thread.start()
+    
+    def _perform_verification(self, modal):
+        try:
+            reconciler = ChecksumReconciler(
+                self.db1, self.db2, self.column_mapping, self.migrated_rows, self._source_key
+            )
+            modal.enqueue("__VERIFIED__", reconciler.run(modal.enqueue))
+        except Exception as e:
+            modal.enqueue("__FAILED__", str(e))
+    
+    def _start_preflight(self):
+        if not self.column_mapping:
+            messagebox.showwarning("Warning", "Configure column mapping first")
+            return
+        
+        modal = TransferModal(
+            self.root, title="Running Preflight Checks...",
+            subtitle="EXPLAIN, indexes, triggers, server settings and sampled timings"
+        )
+        
+        thread = threading.Thread(target=self._perform_preflight, args=(modal,))
+        thread.daemon = True
+        thread.start()
+    
+    def _perform_preflight(self, modal):
+        try:
+            advisor = PreflightAdvisor(
+                self.db1, self.db2, self._map_row,
+                source_key=self.db1.get_primary_key("Job Order"),
+                batch_size=self.throttle_settings['initial_batch'],
+                max_batch=self.throttle_settings['max_batch']
+            )
+            modal.enqueue("__PREFLIGHT__", advisor.run(modal.enqueue))
+        except Exception as e:
+            modal.enqueue("__FAILED__", str(e))
+    
+    def _ping_connections(self):
+        for db in (self.db1, self.db2):
+            if db.connection is not None:
+                db.connection.ping(reconnect=True, attempts=3, delay=2)
+    
     def _normalize_string(self, value):
         if value is None:
             return None
         return str(value).strip().lower()
     
     def _perform_migration(self, modal):
+        self.profiler = MigrationProfiler() if self.profile_run else None
+        if self.profiler is not None:
+            self.profiler.start()
+            modal.enqueue("Profiling enabled (cProfile + tracemalloc)", "INFO")
+        
+        self.migration_running = True
+        try:
+            self._run_migration(modal)
+        finally:
+            self.migration_running = False
+    
+    def _stop_profiler(self, modal):
+        if self.profiler is None:
+            return
+        
+        files = self.profiler.stop()
+        self.profiler = None
+        modal.enqueue(f"Profile written to {', '.join(files)}", "INFO")
+    
+    def _group_source(self, modal):
+        grouper = EmailGrouper(self.group_policy)
+        cursor = self.db1.connection.cursor(dictionary=True)
+        chunk = self.throttle_settings['max_batch']
+        offset = 0
+        
+        while True:
+            rows = self._fetch_source_rows(cursor, offset, chunk)
+            for row in rows:
+                grouper.add(row)
+            offset += len(rows)
+            if len(rows) < chunk:
+                break
+        cursor.close()
+        
+        modal.enqueue(
+            f"Grouped {grouper.rows:,} source rows by email ({grouper.policy} wins"
+            f"{', spilled to disk' if grouper.spilled else ''})",
+            "INFO"
+        )
+        return grouper
+    
+    def _record_losers(self, winner, losers, status):
+        for row in losers:
+            self.grouped_duplicates.append({
+                'first_name': row.get('First Name'),
+                'middle_initial': row.get('Middle Initial'),
+                'last_name': row.get('Last Name'),
+                'email': row.get('Applicant Email Address'),
+                'modem_sn': row.get('Modem/Router SN'),
+                'timestamp': row.get('Timestamp'),
+                'winner_timestamp': winner.get('Timestamp'),
+                'winner_status': status
+            })
+    
+    def _run_migration(self, modal):
+        grouper = None
+        dead_letter = None
+        validator = None
+        assets = None
+        unit = "source row"
+        completed = 0
         try:
             self.multiple_matches = []
             self.no_matches = []
             self.already_exists = []
+            self.grouped_duplicates = []
+            # A resumed run adds to the rows created before the pause/cancel
+            if not self.start_offset:
+                self.migrated_rows = []
             
-            total = self.db1.get_row_count("Job Order")
-            batch_size = 500
-            batches = (total + batch_size - 1) // batch_size
+            with self._phase("read"):
+                self._source_key = self.db1.get_primary_key("Job Order")
+                if self.use_snapshot:
+                    self._prepare_snapshot(modal)
+                    total = self.snapshot.num_rows
+                else:
+                    # Estimate for progress only; the loop runs until the source is exhausted
+                    total = self.db1.get_approx_row_count("Job Order")
+            approx = "" if self.use_snapshot else "~"
+            self.throttle = AdaptiveThrottle(**self.throttle_settings)
             
-            modal.enqueue(f"Starting migration: {total:,} records in {batches} batches", "INFO")
+            if self.group_by_email:
+                with self._phase("read"):
+                    grouper = self._group_source(modal)
+                total = grouper.rows
+                approx = ""
+            
+            modal.enqueue(
+                f"Starting migration: {approx}{total:,} records "
+                f"(adaptive batch {self.throttle.min_batch}-{self.throttle.max_batch}, "
+                f"max {self.throttle.max_rows_per_sec:,} rows/sec)",
+                "INFO"
+            )
             modal.enqueue("Match: Applicant Email Address (Job Order ↔ job_orders)", "INFO")
+            modal.enqueue(f"Write strategy: {self.write_strategy}", "INFO")
             modal.enqueue("=" * 50, "INFO")
             
             source_cursor = self.db1.connection.cursor(dictionary=True)
             target_cursor = self.db2.connection.cursor(dictionary=True)
+            target_cursor.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM job_orders")
+            self._last_target_id = target_cursor.fetchall()[0]['max_id']
+            
+            def reconnect():
+                # A long pause can outlast wait_timeout; reconnect before the next batch
+                nonlocal source_cursor, target_cursor
+                self._ping_connections()
+                for cursor in (source_cursor, target_cursor):
+                    try:
+                        cursor.close()
+                    except Error:
+                        pass
+                source_cursor = self.db1.connection.cursor(dictionary=True)
+                target_cursor = self.db2.connection.cursor(dictionary=True)
+                modal.enqueue("Resumed", "INFO")
+            
+            dead_letter = DeadLetterFile()
+            validator = AssetValidator(**self.asset_settings) if self.validate_assets else None
             
             processed = 0
-            matched = 0
             multiple = 0
             skipped = 0
             created = 0
             exists = 0
+            grouped = 0
             
-            for batch_num in range(batches):
-                offset = batch_num * batch_size
-                source_cursor.execute(f"SELECT * FROM `Job Order` LIMIT {batch_size} OFFSET {offset}")
-                rows = source_cursor.fetchall()
+            # Positions count groups when grouping, source rows otherwise
+            unit = "group" if grouper is not None else "source row"
+            groups = grouper.groups() if grouper is not None else None
+            offset = self.start_offset
+            completed = offset
+            rows_read = offset
+            batch_num = 0
+            cancelled = False
+            
+            if offset:
+                if groups is not None:
+                    rows_read = sum(1 + len(losers) for _, losers in islice(groups, offset))
+                modal.enqueue(f"Resuming after {unit} {offset:,}", "INFO")
+            
+            while True:
+                batch_size = self.throttle.batch_size
+                batch_started = time.perf_counter()
+                failed_before = dead_letter.count
+                
+                with self._phase("read"):
+                    if groups is not None:
+                        items = list(islice(groups, batch_size))
+                    else:
+                        items = [(row, []) for row in self._fetch_source_rows(source_cursor, offset, batch_size)]
+                if not items:
+                    break
+                
+                offset += len(items)
+                rows_read += sum(1 + len(losers) for _, losers in items)
+                batch_num += 1
+                pending = []
+                pending_emails = set()
                 
-                for row in rows:
+                for row, losers in items:
                     email = row.get('Applicant Email Address')
                     
-                    jo_id, status, duplicates = self._find_job_order(target_cursor, email)
+                    # A queued row with the same email must be written before this lookup,
+                    # otherwise this row would not see it as 'exists'
+                    if self._normalize_string(email) in pending_emails:
+                        with self.throttle.measure(), self._phase("insert"):
+                            created += self._write_batch(target_cursor, pending, dead_letter)
+                        pending = []
+                        pending_emails = set()
+                    
+                    with self.throttle.measure('lookup'), self._phase("match"):
+                        jo_id, status, duplicates = self._find_job_order(target_cursor, email)
+                    
+                    # Links are checked for every source row, whatever its outcome: rows that
+                    # exist or match several job orders still carry links that will be migrated
+                    # or resolved later, so the report covers the whole source
+                    with self._phase("transform"):
+                        jo_data = self._map_row(row)
+                        if validator is not None and jo_data:
+                            validator.submit(jo_data, email)
                     
                     if status == 'not_found':
                         skipped += 1
@@ -765,6 +3659,7 @@ class MigrationApp:
                                 'modem_sn': row.get('Modem/Router SN'),
                                 'phone': row.get('Contact Number')
                             },
+                            'jo_data': jo_data,
                             'matches': duplicates
                         })
                     elif status == 'exists':
@@ -778,61 +3673,248 @@ class MigrationApp:
                             'existing_id': jo_id
                         })
                     else:  # status == 'found' - create new record
-                        jo_data = {}
-                        
-                        for db1_col, db2_col in self.column_mapping.items():
-                            if not db2_col:
-                                continue
-                            
-                            value = row.get(db1_col)
-                            if value is not None and value != '':
-                                jo_data[db2_col] = value
-                        
-                        columns = list(jo_data.keys())
-                        values = list(jo_data.values())
-                        placeholders = ', '.join(['%s'] * len(values))
-                        
-                        insert_query = f"INSERT INTO job_orders ({', '.join(columns)}) VALUES ({placeholders})"
-                        target_cursor.execute(insert_query, values)
-                        self.db2.connection.commit()
-                        
-                        created += 1
-                        matched += 1
+                        pending.append((row, jo_data))
+                        pending_emails.add(self._normalize_string(email))
                     
-                    processed += 1
+                    if losers:
+                        self._record_losers(row, losers, status)
+                        grouped += len(losers)
+                    processed += 1 + len(losers)
+                
+                if pending:
+                    with self.throttle.measure(), self._phase("insert"):
+                        created += self._write_batch(target_cursor, pending, dead_letter)
+                completed = offset
+                
+                delay = self.throttle.observe(
+                    len(items), time.perf_counter() - batch_started, dead_letter.count - failed_before
+                )
                 
                 modal.enqueue(
-                    f"Batch {batch_num + 1}/{batches} | Created: {created} | Multiple: {multiple} | Exists: {exists} | Skipped: {skipped}",
+                    f"Batch {batch_num} ({rows_read:,}/{approx}{max(total, rows_read):,}, size {batch_size}, "
+                    f"commit {self.throttle.last_latency * 1000:.0f} ms, "
+                    f"lookup {self.throttle.last_lookup_latency * 1000:.0f} ms) | Created: {created} | Multiple: {multiple} | "
+                    f"Exists: {exists} | Skipped: {skipped} | Failed: {dead_letter.count}",
                     "INFO"
                 )
+                
+                if self.throttle.paused:
+                    modal.enqueue(
+                        f"DB2 commit latency {self.throttle.last_latency * 1000:.0f} ms is over "
+                        f"{self.throttle.pause_latency * 1000:.0f} ms, pausing for {delay:.0f}s",
+                        "WARNING"
+                    )
+                if delay > 0:
+                    self.control.wait(delay)
+                
+                if len(items) < batch_size:
+                    break
+                
+                if not self.control.checkpoint(
+                    on_pause=lambda: modal.enqueue(f"Paused after {unit} {offset:,}", "WARNING"),
+                    on_resume=reconnect
+                ):
+                    cancelled = True
+                    modal.enqueue(f"Cancelled after {unit} {offset:,}", "WARNING")
+                    break
             
             source_cursor.close()
             target_cursor.close()
+            if grouper is not None:
+                grouper.close()
             
-            modal.enqueue("__SUCCESS__", {
+            with self._phase("export"):
+                dead_letter.close()
+                if self.root is None:
+                    # No export buttons in headless runs, so write every non-empty list
+                    for has_rows, writer in (
+                        (self.multiple_matches, self._write_multiples_file),
+                        (self.no_matches, self._write_no_match_file),
+                        (self.already_exists, self._write_already_exists_file),
+                        (self.grouped_duplicates, self._write_grouped_file)
+                    ):
+                        if has_rows:
+                            modal.enqueue(f"Exported to {writer()}", "INFO")
+            
+            if dead_letter.count > 0:
+                modal.enqueue(f"{dead_letter.count} rejected rows written to {dead_letter.filename}", "WARNING")
+            
+            if validator is not None:
+                modal.enqueue(f"Waiting for {validator.pending:,} outstanding link checks...", "INFO")
+                with self._phase("export"):
+                    assets = validator.finish(cancel_pending=cancelled)
+                if assets['broken']:
+                    modal.enqueue(
+                        f"{len(assets['broken']):,} broken links out of {assets['urls']:,} distinct URLs "
+                        f"written to {assets['filename']}",
+                        "WARNING"
+                    )
+                else:
+                    modal.enqueue(f"All {assets['urls']:,} distinct URLs are reachable", "SUCCESS")
+            
+            stats = {
                 'total': processed,
-                'matched': matched,
+                # Rows that were queued but dead-lettered are not matches
+                'matched': created,
                 'created': created,
                 'multiple': multiple,
                 'skipped': skipped,
-                'exists': exists
-            })
+                'exists': exists,
+                'failed': dead_letter.count
+            }
+            if grouper is not None:
+                stats['grouped'] = grouped
+            if assets is not None:
+                stats['assets'] = assets
             
+            if self.verify_after_migration and not cancelled:
+                modal.enqueue("Verifying migrated data with chunk checksums...", "INFO")
+                with self._phase("export"):
+                    reconciler = ChecksumReconciler(
+                        self.db1, self.db2, self.column_mapping, self.migrated_rows, self._source_key
+                    )
+                    stats['reconciliation'] = reconciler.run(modal.enqueue)
+            
+            self._stop_profiler(modal)
+            if cancelled:
+                stats['position'] = offset
+                stats['unit'] = unit
+                self.resume_offset = offset
+                self.resume_grouped = grouper is not None
+                modal.enqueue("__CANCELLED__", stats)
+            else:
+                self.resume_offset = 0
+                modal.enqueue("__SUCCESS__", stats)
+            
+            if self.root is None:
+                return
             if multiple > 0:
                 self.root.after(0, lambda: self.export_multiples_btn.config(state=tk.NORMAL))
+                self.root.after(0, lambda: self.resolve_multiples_btn.config(state=tk.NORMAL))
             if skipped > 0:
                 self.root.after(0, lambda: self.export_nomatch_btn.config(state=tk.NORMAL))
             if exists > 0:
                 self.root.after(0, lambda: self.export_exists_btn.config(state=tk.NORMAL))
+            if grouped > 0:
+                self.root.after(0, lambda: self.export_grouped_btn.config(state=tk.NORMAL))
             
         except Exception as e:
+            if grouper is not None:
+                grouper.close()
+            self._stop_profiler(modal)
+            # Batches up to 'completed' are committed; a retry picks up from there
+            if completed:
+                self.resume_offset = completed
+                self.resume_grouped = grouper is not None
+                hint = f"resume with --start-offset {completed}" if self.root is None else "Start Migration offers to resume"
+                modal.enqueue(f"Stopped after {unit} {completed:,}; {hint}", "WARNING")
             modal.enqueue("__FAILED__", str(e))
+        finally:
+            # Pool threads are joined at interpreter exit, so a failed run must
+            # not leave link checks queued behind it
+            if dead_letter is not None:
+                dead_letter.close()
+            if validator is not None and assets is None:
+                validator.finish(cancel_pending=True)
+    
+    def _map_row(self, row):
+        jo_data = {}
+        
+        for db1_col, db2_col in self.column_mapping.items():
+            if not db2_col:
+                continue
+            
+            value = row.get(db1_col)
+            if value is not None and value != '':
+                jo_data[db2_col] = value
+        
+        return jo_data
+    
+    def _write_batch(self, cursor, pending, dead_letter, attempt=1):
+        """
+        Insert pending (source_row, jo_data) pairs in a single transaction.
+        A batch rejected for its data (ROW_DATA_ERRORS) is rolled back and
+        split in half until the offending rows are isolated; those go to the
+        dead-letter file. Lock waits and deadlocks are retried instead, since
+        they are not caused by the rows. Any other error is re-raised.
+        Returns: number of rows committed
+        """
+        if not pending:
+            return 0
+        
+        try:
+            self._insert_rows(cursor, [jo_data for _, jo_data in pending])
+            created_ids = self._created_ids(cursor)
+            self.db2.connection.commit()
+            for row, _ in pending:
+                email = self._normalize_string(row.get('Applicant Email Address'))
+                self.migrated_rows.append((
+                    email,
+                    row.get(self._source_key) if self._source_key else None,
+                    created_ids.get(email)
+                ))
+            return len(pending)
+        except Error as e:
+            if e.errno in (errorcode.CR_SERVER_GONE_ERROR, errorcode.CR_SERVER_LOST):
+                raise
+            self.db2.connection.rollback()
+            
+            if e.errno in AdaptiveThrottle.LOCK_ERRORS:
+                self.throttle.record_lock_wait()
+                if attempt >= 3:
+                    raise
+                time.sleep(attempt)
+                return self._write_batch(cursor, pending, dead_letter, attempt + 1)
+            
+            if e.errno not in ROW_DATA_ERRORS:
+                raise
+            
+            if len(pending) == 1:
+                row, jo_data = pending[0]
+                dead_letter.write(row, jo_data, e)
+                return 0
+            
+            mid = len(pending) // 2
+            return (
+                self._write_batch(cursor, pending[:mid], dead_letter) +
+                self._write_batch(cursor, pending[mid:], dead_letter)
+            )
+    
+    def _created_ids(self, cursor):
+        """
+        Ids of the rows this transaction just inserted, keyed by normalized email.
+        A primary key range above the highest id seen so far only covers the
+        newest rows, unlike a lookup by email, which scans job_orders.
+        Returns: dict email -> id
+        """
+        cursor.execute("SELECT id, applicant_email FROM job_orders WHERE id > %s", (self._last_target_id,))
+        created_ids = {}
+        for row in cursor.fetchall():
+            created_ids[self._normalize_string(row['applicant_email'])] = row['id']
+            self._last_target_id = max(self._last_target_id, row['id'])
+        return created_ids
+    
+    def _insert_rows(self, cursor, records, table="job_orders"):
+        if self.write_strategy == 'row':
+            for jo_data in records:
+                cursor.execute(job_order_insert_sql(jo_data.keys(), table), tuple(jo_data.values()))
+            return
+        
+        # Rows only carry their non-empty columns, so group rows sharing the
+        # same column list into one multi-row INSERT
+        groups = {}
+        for jo_data in records:
+            groups.setdefault(tuple(jo_data.keys()), []).append(tuple(jo_data.values()))
+        
+        for columns, values in groups.items():
+            cursor.executemany(job_order_insert_sql(columns, table), values)
     
-    def _find_job_order(self, cursor, email):
+    def _find_job_order(self, cursor, email, table="job_orders"):
         """
         Find job order in DB2 by email address
         Returns: (job_order_id or None, status, duplicates_list)
-        Status: 'found', 'not_found', 'multiple', 'exists'
+        Status: 'found' (no job order for this email yet, create one),
+                'not_found' (no email to match on), 'multiple', 'exists'
         """
         if not email or str(email).strip() == '':
             return None, 'not_found', []
@@ -841,16 +3923,13 @@ class MigrationApp:
         
         # Check if email column exists in job_orders table
         # Using applicant_email as per the mapping
-        query = """
-            SELECT * FROM job_orders 
-            WHERE LOWER(TRIM(applicant_email)) = %s
-        """
-        cursor.execute(query, (email_norm,))
+        cursor.execute(job_order_lookup_sql(table), (email_norm,))
         
         results = cursor.fetchall()
         
         if len(results) == 0:
-            return None, 'not_found', []
+            # The source row has an email with no job order in DB2 yet
+            return None, 'found', []
         elif len(results) == 1:
             # Found one match - this means it already exists
             return results[0]['id'], 'exists', []
@@ -858,11 +3937,52 @@ class MigrationApp:
             # Multiple matches found
             return -1, 'multiple', results
     
+    def _start_resolution(self):
+        if not self.multiple_matches:
+            messagebox.showinfo("Info", "No multiple matches to resolve")
+            return
+        
+        resolver = MultipleMatchResolver(self.db2, self.resolution_rules)
+        plan = resolver.build_plan(self.multiple_matches)
+        plan_file = resolver.write_plan(plan)
+        columns = sum(len(fill) for fill in plan['updates'].values())
+        
+        if not messagebox.askyesno(
+            "Resolve Multiple Matches",
+            f"Resolution plan written to {plan_file}\n\n"
+            f"Rules: {' > '.join(plan['rules'])} > lowest id\n"
+            f"Source rows: {len(plan['entries']):,}\n"
+            f"Job orders to fill: {len(plan['updates']):,} ({columns:,} empty columns)\n\n"
+            f"Review the plan file, then apply it now?"
+        ):
+            return
+        
+        modal = TransferModal(
+            self.root, title="Resolving Multiple Matches...",
+            subtitle="Filling empty columns of the winning job orders"
+        )
+        
+        thread = threading.Thread(target=self._perform_resolution, args=(modal, plan_file))
+        thread.daemon = True
+        thread.start()
+    
+    def _perform_resolution(self, modal, plan_file):
+        try:
+            resolver = MultipleMatchResolver(self.db2, self.resolution_rules)
+            modal.enqueue(f"Applying {plan_file}", "INFO")
+            modal.enqueue("__RESOLVED__", resolver.apply(plan_file, modal.enqueue))
+        except Exception as e:
+            modal.enqueue("__FAILED__", str(e))
+    
     def _export_multiples(self):
         if not self.multiple_matches:
             messagebox.showinfo("Info", "No multiple matches to export")
             return
         
+        filename = self._write_multiples_file()
+        messagebox.showinfo("Success", f"Exported to {filename}")
+    
+    def _write_multiples_file(self):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"multiple_matches_{timestamp}.txt"
         
@@ -888,19 +4008,23 @@ class MigrationApp:
                     f.write(f"  - ID: {m['id']} | Email: {m.get('applicant_email', 'N/A')}\n")
                 f.write("\n")
         
-        messagebox.showinfo("Success", f"Exported to {filename}")
+        return filename
     
     def _export_no_match(self):
         if not self.no_matches:
             messagebox.showinfo("Info", "No unmatched records to export")
             return
         
+        filename = self._write_no_match_file()
+        messagebox.showinfo("Success", f"Exported to {filename}")
+    
+    def _write_no_match_file(self):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"no_match_{timestamp}.txt"
         
         with open(filename, 'w') as f:
             f.write("=" * 100 + "\n")
-            f.write("NO MATCHING JOB ORDERS (EMAIL NOT FOUND)\n")
+            f.write("SOURCE ROWS WITHOUT AN APPLICANT EMAIL (SKIPPED)\n")
             f.write(f"Generated: {datetime.now()}\n")
             f.write(f"Total: {len(self.no_matches)}\n")
             f.write("=" * 100 + "\n\n")
@@ -916,13 +4040,17 @@ class MigrationApp:
                 f.write(f"  Modem SN         : {item['modem_sn']}\n")
                 f.write(f"  Username         : {item['username']}\n\n")
         
-        messagebox.showinfo("Success", f"Exported to {filename}")
+        return filename
     
     def _export_already_exists(self):
         if not self.already_exists:
             messagebox.showinfo("Info", "No existing records to export")
             return
         
+        filename = self._write_already_exists_file()
+        messagebox.showinfo("Success", f"Exported to {filename}")
+    
+    def _write_already_exists_file(self):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"already_exists_{timestamp}.txt"
         
@@ -943,16 +4071,348 @@ class MigrationApp:
                 f.write(f"  Modem SN         : {item['modem_sn']}\n")
                 f.write(f"  Existing ID      : {item['existing_id']}\n\n")
         
+        return filename
+    
+    def _export_grouped(self):
+        if not self.grouped_duplicates:
+            messagebox.showinfo("Info", "No grouped duplicates to export")
+            return
+        
+        filename = self._write_grouped_file()
         messagebox.showinfo("Success", f"Exported to {filename}")
+    
+    def _write_grouped_file(self):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"grouped_duplicates_{timestamp}.txt"
+        
+        with open(filename, 'w') as f:
+            f.write("=" * 100 + "\n")
+            f.write("DUPLICATE SOURCE ROWS (SAME EMAIL, NOT MIGRATED)\n")
+            f.write(f"Generated: {datetime.now()}\n")
+            f.write(f"Winner policy: {self.group_policy}\n")
+            f.write(f"Total: {len(self.grouped_duplicates)}\n")
+            f.write("=" * 100 + "\n\n")
+            
+            for idx, item in enumerate(self.grouped_duplicates, 1):
+                f.write(f"Record #{idx}\n")
+                f.write("-" * 100 + "\n")
+                f.write(f"  First Name       : {item['first_name']}\n")
+                f.write(f"  Middle Initial   : {item['middle_initial']}\n")
+                f.write(f"  Last Name        : {item['last_name']}\n")
+                f.write(f"  Email            : {item['email']}\n")
+                f.write(f"  Modem SN         : {item['modem_sn']}\n")
+                f.write(f"  Timestamp        : {item['timestamp']}\n")
+                f.write(f"  Winner Timestamp : {item['winner_timestamp']}\n")
+                f.write(f"  Winner Status    : {item['winner_status']}\n\n")
+        
+        return filename
+
+
+def run_headless(args):
+    app = MigrationApp(None)
+    app.use_snapshot = args.snapshot
+    app.verify_after_migration = args.verify
+    app.profile_run = args.profile
+    app.validate_assets = args.validate_assets
+    app.write_strategy = args.write_strategy
+    for key in ('initial_batch', 'min_batch', 'max_batch', 'pause_seconds', 'max_rows_per_sec'):
+        if getattr(args, key) is not None:
+            app.throttle_settings[key] = getattr(args, key)
+    for key in ('target_latency', 'pause_latency'):
+        if getattr(args, key) is not None:
+            app.throttle_settings[key] = getattr(args, key) / 1000
+    try:
+        AdaptiveThrottle(**app.throttle_settings)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    app.group_by_email = args.group_by_email
+    app.group_policy = args.group_policy
+    try:
+        app.resolution_rules = MultipleMatchResolver(None, args.resolution_rules.split(',')).rules
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    
+    if app.use_snapshot and not app.snapshot.available:
+        print("[ERROR] Snapshots require pyarrow (pip install pyarrow)")
+        return 1
+    
+    success1, msg1 = app.db1.connect()
+    success2, msg2 = app.db2.connect()
+    if not (success1 and success2):
+        print(f"[ERROR] DB1: {msg1} | DB2: {msg2}")
+        return 1
+    
+    if args.preflight:
+        reporter = ConsoleReporter()
+        try:
+            app._perform_preflight(reporter)
+        finally:
+            app.db1.disconnect()
+            app.db2.disconnect()
+        return 0 if reporter.state == "SUCCESS" else 1
+    
+    if args.apply_plan or args.undo_resolution:
+        resolver = MultipleMatchResolver(app.db2, app.resolution_rules)
+        reporter = ConsoleReporter()
+        try:
+            if args.apply_plan:
+                app._perform_resolution(reporter, args.apply_plan)
+            else:
+                resolver.undo(args.undo_resolution, reporter.enqueue)
+                reporter.state = "SUCCESS"
+        except (Error, OSError, ValueError) as e:
+            reporter.enqueue("__FAILED__", str(e))
+        finally:
+            app.db1.disconnect()
+            app.db2.disconnect()
+        return 0 if reporter.state == "SUCCESS" else 1
+    
+    app.start_offset = args.start_offset
+    _install_signal_handlers(app.control)
+    
+    # The engine runs on a worker so the main thread stays free to handle signals
+    reporter = ConsoleReporter()
+    worker = threading.Thread(target=app._perform_migration, args=(reporter,), daemon=True)
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(0.5)
+    finally:
+        app.db1.disconnect()
+        app.db2.disconnect()
+    
+    if reporter.state == "CANCELLED":
+        return 2
+    
+    if reporter.state == "SUCCESS" and args.resolve_multiples and app.multiple_matches:
+        resolver = MultipleMatchResolver(app.db2, app.resolution_rules)
+        plan = resolver.build_plan(app.multiple_matches)
+        print(f"[INFO] Resolution plan for {len(plan['updates']):,} job orders written to "
+              f"{resolver.write_plan(plan)}; review it, then run with --apply-plan")
+    return 0 if reporter.state == "SUCCESS" else 1
+
+
+def _install_signal_handlers(control):
+    """
+    Ctrl+C / SIGTERM cancel at the next batch boundary (a second Ctrl+C aborts).
+    On POSIX, SIGUSR1 pauses and SIGUSR2 resumes.
+    """
+    def on_cancel(signum, frame):
+        if control.cancelled:
+            raise KeyboardInterrupt
+        print("\n[WARNING] Cancel requested; stopping after the current batch commits")
+        control.cancel()
+    
+    def on_pause(signum, frame):
+        print("\n[WARNING] Pause requested; pausing after the current batch commits")
+        control.pause()
+    
+    def on_resume(signum, frame):
+        print("\n[INFO] Resume requested")
+        control.resume()
+    
+    signal.signal(signal.SIGINT, on_cancel)
+    signal.signal(signal.SIGTERM, on_cancel)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, on_pause)
+        signal.signal(signal.SIGUSR2, on_resume)
+
+
+BENCHMARK_TABLE = "migration_benchmark"
+
+
+def _benchmark_rows(count):
+    rows = []
+    for i in range(count):
+        jo_data = {
+            'applicant_email': f"bench{i}@example.com",
+            'first_name': f"First{i}",
+            'last_name': f"Last{i}",
+            'address': f"{i} Benchmark Street, Barangay Sample, City {i % 50}",
+            'status': 'Done'
+        }
+        # Mapped rows only carry non-empty columns, so mix column sets the way real batches do
+        if i % 5:
+            jo_data['remarks'] = "r" * 200
+        rows.append(jo_data)
+    return rows
+
+
+def run_benchmark(args):
+    """
+    Runs the migration's per-batch DB2 work through LatencyProxy at each RTT
+    in --rtts, once per write strategy, against a local stand-in MySQL: every
+    row is looked up by email the way _find_job_order does, then the batch is
+    written and committed. Everything happens in --bench-database, which must
+    not be one of the migration's own schemas; the table is dropped afterwards.
+    """
+    rtts = [float(value) for value in args.rtts.split(',')]
+    strategies = [value.strip() for value in args.strategies.split(',')]
+    unknown = [value for value in strategies if value not in WRITE_STRATEGIES]
+    if unknown:
+        print(f"[ERROR] Unknown write strategy: {', '.join(unknown)} (choose from {', '.join(WRITE_STRATEGIES)})")
+        return 1
+    
+    app = MigrationApp(None)
+    if args.bench_database in (app.db1.database, app.db2.database):
+        print(f"[ERROR] --bench-database {args.bench_database} is a migration schema; use a scratch database")
+        return 1
+    
+    setup = DatabaseConnection(args.bench_host, args.bench_port, args.bench_user, args.bench_password, None)
+    success, msg = setup.connect()
+    if not success:
+        print(f"[ERROR] Stand-in database: {msg}")
+        return 1
+    
+    cursor = setup.connection.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{args.bench_database}`")
+    cursor.execute(f"USE `{args.bench_database}`")
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {BENCHMARK_TABLE} ("
+        f"id INT AUTO_INCREMENT PRIMARY KEY, applicant_email VARCHAR(255), first_name VARCHAR(100), "
+        f"last_name VARCHAR(100), address VARCHAR(255), status VARCHAR(50), remarks TEXT)"
+    )
+    
+    rows = _benchmark_rows(args.bench_rows)
+    results = []
+    
+    try:
+        for rtt in rtts:
+            for strategy in strategies:
+                cursor.execute(f"TRUNCATE TABLE {BENCHMARK_TABLE}")
+                
+                with LatencyProxy(args.bench_host, args.bench_port, latency=rtt / 1000,
+                                  jitter=args.jitter / 1000, bandwidth=args.bandwidth * 125000) as proxy:
+                    target = DatabaseConnection(proxy.address[0], proxy.address[1], args.bench_user,
+                                                args.bench_password, args.bench_database)
+                    success, msg = target.connect()
+                    if not success:
+                        print(f"[ERROR] Through proxy: {msg}")
+                        return 1
+                    
+                    app.write_strategy = strategy
+                    write_cursor = target.connection.cursor(dictionary=True)
+                    lookup_seconds = 0.0
+                    start = time.perf_counter()
+                    for offset in range(0, len(rows), args.bench_batch):
+                        batch = rows[offset:offset + args.bench_batch]
+                        lookup_started = time.perf_counter()
+                        for jo_data in batch:
+                            app._find_job_order(write_cursor, jo_data['applicant_email'], table=BENCHMARK_TABLE)
+                        lookup_seconds += time.perf_counter() - lookup_started
+                        app._insert_rows(write_cursor, batch, table=BENCHMARK_TABLE)
+                        target.connection.commit()
+                    elapsed = time.perf_counter() - start
+                    write_cursor.close()
+                    target.disconnect()
+                    
+                    result = {
+                        'rtt': rtt,
+                        'strategy': strategy,
+                        'rows': len(rows),
+                        'seconds': elapsed,
+                        'lookup_seconds': lookup_seconds,
+                        'rows_per_sec': len(rows) / elapsed if elapsed else 0,
+                        'bytes_up': proxy.bytes['up'],
+                        'bytes_down': proxy.bytes['down']
+                    }
+                results.append(result)
+                print(f"[INFO] RTT {rtt:>6.1f} ms | {strategy:<8} | {result['rows']:,} rows in "
+                      f"{elapsed:.2f}s (lookups {lookup_seconds:.2f}s) | {result['rows_per_sec']:,.0f} rows/sec")
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}")
+        cursor.close()
+        setup.disconnect()
+    
+    filename = _write_benchmark_report(args, results)
+    print(f"[SUCCESS] Benchmark report: {filename}")
+    return 0
+
+
+def _write_benchmark_report(args, results):
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"benchmark_{timestamp}.txt"
+    
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write("=" * 100 + "\n")
+        f.write("WRITE STRATEGY BENCHMARK (local MySQL behind LatencyProxy)\n")
+        f.write(f"Generated: {datetime.now()}\n")
+        f.write(f"Database: {args.bench_database} | Rows: {args.bench_rows:,} | Batch: {args.bench_batch:,} | "
+                f"Jitter: {args.jitter} ms | Bandwidth: {args.bandwidth or 'unlimited'} Mbit/s\n")
+        f.write("Seconds include one email lookup per row (as in the migration) plus the batch insert and commit\n")
+        f.write("=" * 100 + "\n\n")
+        f.write(f"{'RTT (ms)':>10}  {'Strategy':<10}{'Seconds':>10}{'Lookups':>10}{'Rows/sec':>12}"
+                f"{'Bytes up':>14}{'Bytes down':>14}\n")
+        f.write("-" * 100 + "\n")
+        for item in results:
+            f.write(f"{item['rtt']:>10.1f}  {item['strategy']:<10}{item['seconds']:>10.2f}{item['lookup_seconds']:>10.2f}"
+                    f"{item['rows_per_sec']:>12,.0f}{item['bytes_up']:>14,}{item['bytes_down']:>14,}\n")
+    
+    return filename
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Job Order Migration Tool")
+    parser.add_argument("--headless", action="store_true", help="run the migration without the UI")
+    parser.add_argument("--snapshot", action="store_true", help="read the source from the local snapshot")
+    parser.add_argument("--verify", action="store_true", help="verify with chunk checksums after migration")
+    parser.add_argument("--profile", action="store_true", help="profile the run with cProfile and tracemalloc")
+    parser.add_argument("--validate-assets", action="store_true", help="check migrated image and contract URLs")
+    parser.add_argument("--start-offset", type=int, default=0,
+                        help="resume after this many source rows (groups with --group-by-email)")
+    parser.add_argument("--group-by-email", action="store_true",
+                        help="group source rows by email and migrate one winner per email")
+    parser.add_argument("--group-policy", choices=EmailGrouper.POLICIES, default="newest_timestamp",
+                        help="which row of an email group wins")
+    parser.add_argument("--preflight", action="store_true", help="with --headless, only run the preflight checks")
+    parser.add_argument("--initial-batch", type=int, help="first batch size (default 500)")
+    parser.add_argument("--min-batch", type=int, help="smallest adaptive batch size (default 50)")
+    parser.add_argument("--max-batch", type=int, help="largest adaptive batch size (default 2000)")
+    parser.add_argument("--target-latency", type=float, help="target batch commit latency in ms (default 500)")
+    parser.add_argument("--pause-latency", type=float, help="pause when commit latency exceeds this many ms (default 5000)")
+    parser.add_argument("--pause-seconds", type=float, help="pause length in seconds (default 30)")
+    parser.add_argument("--max-rows-per-sec", type=int, help="rate cap, 0 for none (default 1000)")
+    parser.add_argument("--resolve-multiples", action="store_true",
+                        help="write a resolution plan for multiple matches after the run")
+    parser.add_argument("--resolution-rules", default=",".join(MultipleMatchResolver.RULES),
+                        help="rule precedence for picking the winning job order")
+    parser.add_argument("--apply-plan", metavar="FILE", help="with --headless, apply a reviewed resolution plan")
+    parser.add_argument("--undo-resolution", metavar="FILE", help="with --headless, restore from a resolution undo log")
+    parser.add_argument("--write-strategy", choices=WRITE_STRATEGIES, default="multirow",
+                        help="how batches are written to DB2")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="benchmark write strategies against a local MySQL behind a latency proxy")
+    parser.add_argument("--rtts", default="0,10,50,100", help="benchmark round-trip times in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="benchmark jitter in ms")
+    parser.add_argument("--bandwidth", type=float, default=0, help="benchmark bandwidth cap in Mbit/s (0 = none)")
+    parser.add_argument("--strategies", default=",".join(WRITE_STRATEGIES), help="benchmark write strategies")
+    parser.add_argument("--bench-rows", type=int, default=2000)
+    parser.add_argument("--bench-batch", type=int, default=500)
+    parser.add_argument("--bench-host", default="localhost")
+    parser.add_argument("--bench-port", type=int, default=3306)
+    parser.add_argument("--bench-user", default="root")
+    parser.add_argument("--bench-password", default="")
+    parser.add_argument("--bench-database", default="migration_benchmark",
+                        help="scratch database for the benchmark, created if missing")
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("JOB ORDER MIGRATION TOOL - PROFESSIONAL EDITION")
     print("=" * 80)
-    print("Starting application...")
+    if args.benchmark:
+        print("Running write strategy benchmark...")
+    else:
+        print("Starting application..." if not args.headless else "Running headless migration...")
     print("=" * 80 + "\n")
     
+    if args.benchmark:
+        sys.exit(run_benchmark(args))
+    
+    if args.headless:
+        sys.exit(run_headless(args))
+    
     root = tk.Tk()
     app = MigrationApp(root)
     root.mainloop()
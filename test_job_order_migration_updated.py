@@ -0,0 +1,91 @@
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from job_order_migration_updated import AssetValidator
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the image/contract host"""
+    
+    def do_HEAD(self):
+        if self.path == '/nohead.jpg':
+            self.send_response(405)
+        elif self.path == '/missing.jpg':
+            self.send_response(404)
+        else:
+            self.send_response(200)
+        self.end_headers()
+    
+    def do_GET(self):
+        if self.path == '/missing.jpg':
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(206 if self.headers.get('Range') else 200)
+        self.send_header('Content-Length', '1')
+        self.end_headers()
+        self.wfile.write(b'x')
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class AssetValidatorTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+    
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def test_check_ok(self):
+        self.assertEqual(AssetValidator(timeout=5).check(f"{self.base}/ok.jpg"), ('ok', 200))
+    
+    def test_check_not_found(self):
+        self.assertEqual(AssetValidator(timeout=5).check(f"{self.base}/missing.jpg"), ('broken', 404))
+    
+    def test_check_head_refused_falls_back_to_get(self):
+        self.assertEqual(AssetValidator(timeout=5).check(f"{self.base}/nohead.jpg"), ('ok', 206))
+    
+    def test_check_invalid(self):
+        validator = AssetValidator(timeout=5)
+        self.assertEqual(validator.check("ftp://example.com/a.jpg")[0], 'invalid')
+        self.assertEqual(validator.check("not a url")[0], 'invalid')
+    
+    def test_finish_reports_broken_links(self):
+        validator = AssetValidator(timeout=5)
+        validator.submit({
+            'setup_image_url': f"{self.base}/ok.jpg",
+            'speedtest_image_url': f"{self.base}/nohead.jpg",
+            'contract_link': f"{self.base}/missing.jpg"
+        }, "a@example.com")
+        validator.submit({
+            'setup_image_url': f"{self.base}/ok.jpg",
+            'box_reading_image_url': "no-scheme.jpg"
+        }, "b@example.com")
+        
+        summary = validator.finish()
+        
+        self.assertEqual(summary['urls'], 4)
+        self.assertEqual(summary['columns']['setup_image_url']['ok'], 2)
+        self.assertEqual(summary['columns']['speedtest_image_url']['ok'], 1)
+        self.assertEqual(
+            sorted((column, email, status) for column, _, email, status, _ in summary['broken']),
+            [('box_reading_image_url', 'b@example.com', 'invalid'), ('contract_link', 'a@example.com', 'broken')]
+        )
+        self.assertTrue(os.path.exists(summary['filename']))
+
+
+if __name__ == "__main__":
+    unittest.main()